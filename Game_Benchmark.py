@@ -0,0 +1,315 @@
+"""
+game_benchmark.py
+Frame-time benchmark - Drives each RPGGame screen headlessly and compares timings against a baseline
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# The benchmark never opens a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from Game_display import RPGGame
+
+
+FRAMES = 300
+WARMUP_FRAMES = 30
+STARTUP_RUNS = 5
+TOLERANCE = 0.25   # allowed slowdown over the baseline, as a fraction
+MIN_DELTA_MS = 0.05  # ignore regressions smaller than this (timer noise on tiny phases)
+
+
+# ========== SCENES ==========
+
+def _combat(game):
+    game.start_game()
+    game.start_combat(game.engine.create_enemy("goblin"), game.reach_village)
+
+    for i in range(12):
+        game.add_combat_log(f"You deal {i + 5} damage!")
+
+
+def _shop(game):
+    game.start_game()
+    game.engine.player.gold = 1000
+    game.visit_shop()
+
+
+def _gameover(game):
+    game.start_game()
+    game.game_over()
+
+
+def _victory(game):
+    game.start_game()
+    game.victory()
+
+
+# Scene name -> function that puts a fresh game on that screen
+SCENES = {
+    "start": lambda game: game.show_start(),
+    "exploration": lambda game: game.start_game(),
+    "combat": _combat,
+    "shop": _shop,
+    "gameover": _gameover,
+    "victory": _victory
+}
+
+
+# ========== TIMING ==========
+
+class PhaseTimer:
+    """Wraps a game's handle_events, draw_screen, *_screen and draw_* methods to time each call"""
+
+    def __init__(self, game):
+        self.samples = {}
+
+        names = ["handle_events"] + sorted(
+            name for name in dir(type(game)) if name.startswith("draw_") or name.endswith("_screen")
+        )
+
+        for name in names:
+            setattr(game, name, self._wrap(name, getattr(game, name)))
+
+    def _wrap(self, name, method):
+        samples = self.samples.setdefault(name, [])
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                samples.append((clock() - start) * 1000)
+
+        return timed
+
+    def reset(self):
+        """Drop samples taken so far (after warmup)"""
+        for samples in self.samples.values():
+            samples.clear()
+
+
+def _percentile(values, q):
+    """q-th percentile of an already sorted list (nearest rank)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def _summarize(times):
+    times = sorted(times)
+    return {
+        "calls": len(times),
+        "mean": sum(times) / len(times) if times else 0.0,
+        "p50": _percentile(times, 50),
+        "p95": _percentile(times, 95),
+        "p99": _percentile(times, 99)
+    }
+
+
+def bench_scene(name, frames=FRAMES, warmup=WARMUP_FRAMES, full=True):
+    """Drive one screen for a number of frames; returns frame and per-phase timings in ms
+
+    Each frame is an input event, handle_events(), a timeline update and a
+    render. With full, every frame repaints the whole window (the worst
+    case); otherwise the dirty-rect renderer only redraws what changed.
+    """
+    with tempfile.TemporaryDirectory(prefix="rpg-bench-") as save_dir:
+        game = RPGGame(headless=True, save_path=os.path.join(save_dir, "autosave.sav"), telemetry_dir=None)
+
+        try:
+            SCENES[name](game)
+            timer = PhaseTimer(game)
+
+            width, height = game.screen.get_size()
+            frame_times = []
+
+            for frame in range(warmup + frames):
+                if frame == warmup:
+                    timer.reset()
+                    frame_times.clear()
+
+                # Sweep the pointer across the window so hover handling has work to do
+                pos = (frame * 37 % width, frame * 23 % height)
+                pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+
+                start = time.perf_counter()
+                game.handle_events()
+                game.timeline.update()
+
+                if full:
+                    game.force_redraw()
+                game.render()
+                frame_times.append((time.perf_counter() - start) * 1000)
+        finally:
+            game.autosaver.close()
+
+    result = _summarize(frame_times)
+    result["phases"] = {phase: _summarize(samples) for phase, samples in timer.samples.items() if samples}
+    return result
+
+
+# Runs in a fresh interpreter so module import and subsystem init are measured cold
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+
+import Game_display
+imported = time.perf_counter()
+
+game = Game_display.RPGGame(headless=True, save_path=sys.argv[1], telemetry_dir=None)
+created = time.perf_counter()
+
+game.handle_events()
+game.render()
+drawn = time.perf_counter()
+
+game.autosaver.close()
+print(json.dumps({"import": (imported - start) * 1000, "init": (created - imported) * 1000,
+                  "first_frame": (drawn - created) * 1000, "total": (drawn - start) * 1000}))
+"""
+
+
+def bench_startup(runs=STARTUP_RUNS):
+    """Time-to-first-frame over fresh processes, split into import, RPGGame() and the first render"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    samples = {}
+
+    with tempfile.TemporaryDirectory(prefix="rpg-bench-") as save_dir:
+        save_path = os.path.join(save_dir, "autosave.sav")
+
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, "-c", STARTUP_SCRIPT, save_path],
+                cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                capture_output=True, text=True, check=True
+            ).stdout
+
+            for phase, ms in json.loads(output.splitlines()[-1]).items():
+                samples.setdefault(phase, []).append(ms)
+
+    return {phase: _summarize(times) for phase, times in samples.items()}
+
+
+def run_benchmark(scenes=None, frames=FRAMES, warmup=WARMUP_FRAMES, full=True, startup_runs=STARTUP_RUNS):
+    """Benchmark every (or the named) scene, plus startup time"""
+    return {
+        "frames": frames,
+        "full": full,
+        "startup": bench_startup(startup_runs) if startup_runs else None,
+        "scenes": {name: bench_scene(name, frames, warmup, full) for name in scenes or SCENES}
+    }
+
+
+# ========== BASELINE ==========
+
+def save_baseline(results, path):
+    """Store results as the baseline to compare later runs against"""
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    """Read a baseline written by save_baseline()"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_delta_ms=MIN_DELTA_MS):
+    """Regressions against a baseline as (scene, phase, metric, baseline ms, current ms)
+
+    Frame p50/p95, each phase's p50 and the startup total p50 (process start
+    to first frame) are checked; p99 is reported but too noisy on shared machines to fail a run on.
+    """
+    regressions = []
+
+    startup, base = results.get("startup"), baseline.get("startup")
+    if startup and base:
+        old, new = base["total"]["p50"], startup["total"]["p50"]
+        if new > old * (1 + tolerance) and new - old > min_delta_ms:
+            regressions.append(("startup", "total", "p50", old, new))
+
+    for scene, current in results["scenes"].items():
+        base = baseline["scenes"].get(scene)
+        if base is None:
+            continue
+
+        checks = [("frame", metric, base[metric], current[metric]) for metric in ("p50", "p95")]
+        for phase, timings in current["phases"].items():
+            if phase in base["phases"]:
+                checks.append((phase, "p50", base["phases"][phase]["p50"], timings["p50"]))
+
+        for phase, metric, old, new in checks:
+            if new > old * (1 + tolerance) and new - old > min_delta_ms:
+                regressions.append((scene, phase, metric, old, new))
+
+    return regressions
+
+
+def format_report(results, baseline=None):
+    """Format benchmark results as a text table"""
+    lines = [
+        f"{results['frames']} frames per scene ({'full redraw' if results['full'] else 'dirty rects'}), times in ms",
+        f"{'Scene':<14}{'Phase':<22}{'mean':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'base p50':>10}"
+    ]
+    baseline = baseline or {}
+
+    sections = []
+    if results.get("startup"):
+        base = baseline.get("startup") or {}
+        sections.append(("startup", [(phase, timings, base.get(phase)) for phase, timings in results["startup"].items()]))
+
+    for scene, result in results["scenes"].items():
+        base = baseline.get("scenes", {}).get(scene)
+        rows = [("frame", result, base)]
+        rows += [(phase, timings, base and base["phases"].get(phase)) for phase, timings in sorted(result["phases"].items())]
+        sections.append((scene, rows))
+
+    for scene, rows in sections:
+        for phase, timings, old in rows:
+            base_p50 = f"{old['p50']:>10.3f}" if old else f"{'-':>10}"
+            lines.append(
+                f"{scene:<14}{phase:<22}{timings['mean']:>8.3f}{timings['p50']:>8.3f}"
+                f"{timings['p95']:>8.3f}{timings['p99']:>8.3f}{base_p50}"
+            )
+            scene = ""
+    return "\n".join(lines)
+
+
+# ========== RUN BENCHMARK ==========
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark for each game screen")
+
+    parser.add_argument("--scene", action="append", choices=sorted(SCENES))
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--warmup", type=int, default=WARMUP_FRAMES)
+    parser.add_argument("--incremental", action="store_true", help="time dirty-rect frames instead of full redraws")
+    parser.add_argument("--startup-runs", type=int, default=STARTUP_RUNS, help="fresh processes for time-to-first-frame (0 to skip)")
+
+    parser.add_argument("--baseline", help="compare against this baseline and exit 1 on a regression")
+    parser.add_argument("--save-baseline", help="write the results to this file as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.scene, args.frames, args.warmup, not args.incremental, args.startup_runs)
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    print(format_report(results, baseline))
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for scene, phase, metric, old, new in regressions:
+            print(f"REGRESSION {scene} {phase} {metric}: {old:.3f} -> {new:.3f} ms")
+        sys.exit(1 if regressions else 0)
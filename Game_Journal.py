@@ -0,0 +1,191 @@
+"""
+game_journal.py
+Action journal - Records every GameEngine action with periodic snapshots for seek and replay
+"""
+
+import time
+from array import array
+from bisect import bisect_right
+
+from Game_Logic import Enemy, GameEngine, JOURNALED_ACTIONS
+
+
+START_COMBAT = JOURNALED_ACTIONS.index("start_combat")
+
+
+class JournalMismatch(Exception):
+    """Replay produced a different state than the one recorded"""
+
+
+class Journal:
+    """Append-only log of engine actions plus a full snapshot every N actions
+
+    Record t is codes[t] (the action code) and args[t]. Turn t means
+    "after t records", so seek(t) restores the nearest snapshot at or
+    before t and re-applies at most snapshot_interval records.
+
+    Changes made outside the journaled actions (a reseed, a restore) can't
+    be replayed, so they leave a barrier: a snapshot that replay restores
+    when it reaches that turn instead of carrying on from the last state.
+    """
+
+    def __init__(self, snapshot_interval=1000):
+        self.snapshot_interval = snapshot_interval
+
+        self.codes = array("B")
+        self.args = []
+        self.checks = array("q")
+
+        self.snapshot_turns = []
+        self.snapshots = []
+        self.barrier_turns = []
+
+    def attach(self, engine):
+        """Start recording an engine from its current state"""
+        engine.journal = self
+        self.checkpoint(engine)
+
+    def detach(self, engine):
+        """Stop recording an engine"""
+        engine.journal = None
+
+    def checkpoint(self, engine):
+        """Take a snapshot at the current turn, replacing one already taken there"""
+        turn = len(self.codes)
+
+        if self.snapshot_turns and self.snapshot_turns[-1] == turn:
+            self.snapshots[-1] = engine.snapshot()
+        else:
+            self.snapshot_turns.append(turn)
+            self.snapshots.append(engine.snapshot())
+
+    def barrier(self, engine):
+        """Snapshot state that was changed outside the journaled actions"""
+        self.checkpoint(engine)
+
+        turn = len(self.codes)
+        if not self.barrier_turns or self.barrier_turns[-1] != turn:
+            self.barrier_turns.append(turn)
+
+    def record(self, engine, code, args):
+        """Called by @journaled before an action runs"""
+        if len(self.codes) % self.snapshot_interval == 0:
+            self.checkpoint(engine)
+
+        # Enemies are stored by value so the record doesn't pin a live object
+        if code == START_COMBAT:
+            args = (args[0].state(),)
+        self.codes.append(code)
+        self.args.append(args)
+
+    def confirm(self, engine):
+        """Called by @journaled after an action ran - stores a state fingerprint"""
+        self.checks.append(_fingerprint(engine))
+
+    def abort(self, engine):
+        """Called by @journaled when an action raised - drops its record"""
+        self.codes.pop()
+        self.args.pop()
+        self.barrier(engine)
+
+    def __len__(self):
+        return len(self.codes)
+
+    # ========== SEEK / REPLAY ==========
+
+    def seek(self, turn, engine=None):
+        """Return an engine in the state it was in after `turn` records"""
+        if not 0 <= turn <= len(self.codes):
+            raise IndexError(f"Turn {turn} is outside the journal (0..{len(self.codes)})")
+
+        index = bisect_right(self.snapshot_turns, turn) - 1
+        if index < 0:
+            raise IndexError(f"No snapshot at or before turn {turn}")
+
+        engine = engine or GameEngine()
+        engine.journal = None
+        engine.restore(self.snapshots[index])
+
+        self._apply(engine, self.snapshot_turns[index], turn, 0)
+        return engine
+
+    def replay(self, engine=None, verify=True, check_every=1):
+        """Re-run the whole journal from its first snapshot, restoring barrier snapshots on the way
+
+        With verify, the state fingerprint is compared against the recorded
+        one after every check_every actions (and after the last), raising
+        JournalMismatch on the first difference. A larger check_every
+        replays faster but reports a divergence up to that many turns late.
+        Returns (engine, turns per second).
+        """
+        engine = engine or GameEngine()
+        engine.journal = None
+        engine.restore(self.snapshots[0])
+        check_every = check_every if verify else 0
+
+        start = time.perf_counter()
+        turn = self.snapshot_turns[0]
+        for barrier in self.barrier_turns:
+            if barrier > turn:
+                self._apply(engine, turn, barrier, check_every)
+                engine.restore(self.snapshots[bisect_right(self.snapshot_turns, barrier) - 1])
+                turn = barrier
+
+        self._apply(engine, turn, len(self.codes), check_every)
+        elapsed = time.perf_counter() - start
+
+        turns = len(self.codes) - self.snapshot_turns[0]
+        return engine, turns / elapsed if elapsed > 0 else float("inf")
+
+    def _apply(self, engine, start, stop, check_every):
+        """Re-apply records start..stop-1 to an engine, checking the fingerprint every check_every turns (0 for never)"""
+        # Bind the undecorated methods once so replay skips the journal wrapper
+        actions = [getattr(GameEngine, name).__wrapped__ for name in JOURNALED_ACTIONS]
+        from_state = Enemy.from_state
+        checks = self.checks
+
+        # Nobody reads the combat events of a replay
+        quiet = engine.quiet
+        engine.quiet = True
+
+        # Counts down to the next check
+        countdown = check_every
+        turn = start - 1
+
+        try:
+            if not check_every:
+                for code, args in zip(self.codes[start:stop], self.args[start:stop]):
+                    if code == START_COMBAT:
+                        args = (from_state(args[0]),)
+                    actions[code](engine, *args)
+                return
+
+            for turn, code, args in zip(range(start, stop), self.codes[start:stop], self.args[start:stop]):
+                if code == START_COMBAT:
+                    args = (from_state(args[0]),)
+                actions[code](engine, *args)
+
+                countdown -= 1
+                if countdown == 0:
+                    countdown = check_every
+                    if _fingerprint(engine) != checks[turn]:
+                        raise JournalMismatch(f"Replay diverged by turn {turn} ({JOURNALED_ACTIONS[code]})")
+
+            # The last few turns of a block that didn't fill up
+            if countdown != check_every and _fingerprint(engine) != checks[turn]:
+                raise JournalMismatch(f"Replay diverged by turn {turn} ({JOURNALED_ACTIONS[code]})")
+        finally:
+            engine.quiet = quiet
+
+
+def _fingerprint(engine):
+    """Cheap hash of the state most actions change
+
+    Level and elixir turns are left out: a level shows in exp and hp, and
+    an active elixir in attack.
+    """
+    player = engine.player
+    enemy = engine.current_enemy
+
+    return hash((player.hp, player.gold, player.exp, player.attack,
+                 enemy.hp if enemy else -1, player.inventory.total))
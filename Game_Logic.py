@@ -3,21 +3,291 @@ game_logic.py
 RPG Game Logic Module - Contains all game mechanics, player, enemy, and story logic
 """
 
+import inspect
+import json
 import random
+from bisect import bisect_right
+from collections import namedtuple
+from functools import wraps
+from types import MappingProxyType
+
+
+class GameRNG(random.Random):
+    """Seedable random stream that can be split into independent child streams"""
+    
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        
+        self.base_seed = seed
+        super().__init__(seed)
+    
+    def split(self, count):
+        """Derive `count` independent streams, e.g. one per worker process"""
+        return [GameRNG(f"{self.base_seed}/{i}") for i in range(count)]
+    
+    def roller(self, low, high, size=4096):
+        """Buffered source of randint(low, high) rolls"""
+        return RollBuffer(self, low, high, size)
+
+
+class RollBuffer:
+    """Pre-draws a block of integer rolls so hot loops pay one call per block"""
+    
+    __slots__ = ("rng", "population", "size", "rolls", "index")
+    
+    def __init__(self, rng, low, high, size=4096):
+        self.rng = rng
+        self.population = range(low, high + 1)
+        
+        self.size = size
+        self.rolls = []
+        self.index = 0
+    
+    def next(self):
+        """Next roll, refilling the buffer when it runs dry"""
+        index = self.index
+        if index == len(self.rolls):
+            self.rolls = self.rng.choices(self.population, k=self.size)
+            index = 0
+        
+        self.index = index + 1
+        return self.rolls[index]
+    
+    def pending(self):
+        """Rolls drawn but not used yet"""
+        return self.rolls[self.index:]
+    
+    def restore(self, rolls):
+        """Put back rolls returned by pending()"""
+        self.rolls = list(rolls)
+        self.index = 0
+    
+    def clear(self):
+        """Drop any pre-drawn rolls"""
+        self.restore(())
+
+
+class Inventory:
+    """Counted multiset of item names with O(1) add/use/has"""
+    
+    __slots__ = ("counts", "total", "version", "view")
+    
+    def __init__(self, items=()):
+        self.counts = {}
+        self.total = 0
+        
+        # Bumped on every change so the UI can skip rebuilding its inventory text
+        self.version = 0
+        self.view = MappingProxyType(self.counts)
+        
+        for item in items:
+            self.add(item)
+    
+    @classmethod
+    def from_counts(cls, counts):
+        """Build an inventory from an {item: count} mapping"""
+        inventory = cls()
+        inventory.counts.update(counts)
+        
+        inventory.total = sum(counts.values())
+        inventory.version = 1
+        return inventory
+    
+    def add(self, item_name):
+        """Add one of an item"""
+        self.counts[item_name] = self.counts.get(item_name, 0) + 1
+        self.total += 1
+        
+        self.version += 1
+    
+    def use(self, item_name):
+        """Remove one of an item, returning False if there is none"""
+        count = self.counts.get(item_name, 0)
+        if not count:
+            return False
+        
+        if count == 1:
+            del self.counts[item_name]
+        else:
+            self.counts[item_name] = count - 1
+        
+        self.total -= 1
+        self.version += 1
+        return True
+    
+    def has(self, item_name):
+        """Check if at least one of an item is held"""
+        return item_name in self.counts
+    
+    def count(self, item_name):
+        """How many of an item are held"""
+        return self.counts.get(item_name, 0)
+    
+    def __contains__(self, item_name):
+        return item_name in self.counts
+    
+    def __len__(self):
+        return self.total
+    
+    def __iter__(self):
+        for item, count in self.counts.items():
+            for _ in range(count):
+                yield item
+
+
+# Item effects
+POTION_HEAL = 40
+ELIXIR_BOOST = 15
+ELIXIR_TURNS = 3
+
+
+# Text for each combat event kind, filled from the event's fields when it is displayed
+EVENT_TEXT = {
+    "hit": "💥 You dealt {amount} damage!",
+    "enemy_hit": "💢 {actor} dealt {amount} damage!",
+    "brace": "🛡️ You brace for attack!",
+    "braced_hit": "Reduced damage to {amount}!",
+    "heal": "🧪 Restored {amount} HP!",
+    "boost": f"⚡ Attack +{{amount}} for {ELIXIR_TURNS} turns!",
+    "boost_expired": "⏳ Strength boost wore off!",
+    "no_item": "❌ No {item}s!",
+    "gold": "🎊 Victory! +{amount} gold",
+    "exp": "✨ +{amount} EXP",
+    "level_up": "🎉 LEVEL UP! Now level {amount}!",
+    "level_stats": "Max HP +{amount[0]}, Attack +{amount[1]}, Defense +{amount[2]}",
+    "loot": "🏆 Obtained {item}!"
+}
+
+
+class CombatEvent(namedtuple("CombatEvent", "kind actor amount item")):
+    """Something that happened in combat; only turned into text when displayed"""
+    __slots__ = ()
+    
+    def __str__(self):
+        return EVENT_TEXT[self.kind].format(actor=self.actor, amount=self.amount, item=self.item)
+
+
+# Returned by actions on a quiet engine, which records no events
+NO_EVENTS = ()
+
+
+# Stat gains per level
+LEVEL_HP = 20
+LEVEL_ATTACK = 5
+LEVEL_DEFENSE = 2
+
+FIRST_EXP_NEEDED = 100
+EXP_GROWTH = 1.5
+
+
+class LevelTable:
+    """EXP needed for each level and the cumulative EXP to reach it, grown on demand
+    
+    A player's progress is (level, exp into that level), which maps to one
+    total EXP figure; the level for any total is then a bisect over the
+    cumulative thresholds instead of one level_up() call per level.
+    """
+    
+    __slots__ = ("needed", "totals")
+    
+    def __init__(self):
+        # Index 0 is level 1: EXP to the next level, and total EXP to reach this one
+        self.needed = [FIRST_EXP_NEEDED]
+        self.totals = [0]
+    
+    def _grow(self, level=None, total=None):
+        needed, totals = self.needed, self.totals
+        while (level is not None and len(totals) < level) or (total is not None and totals[-1] <= total):
+            totals.append(totals[-1] + needed[-1])
+            needed.append(int(needed[-1] * EXP_GROWTH))
+    
+    def exp_needed(self, level):
+        """EXP from the start of a level to the next one"""
+        self._grow(level=level)
+        return self.needed[level - 1]
+    
+    def total_exp(self, level):
+        """Total EXP a fresh level 1 character needs to reach a level"""
+        self._grow(level=level)
+        return self.totals[level - 1]
+    
+    def level_for(self, total):
+        """(level, exp into that level) for a total EXP figure"""
+        self._grow(total=total)
+        level = bisect_right(self.totals, total)
+        return level, total - self.totals[level - 1]
+
+
+LEVELS = LevelTable()
+
+
+# Stats that modifiers can change, and the stat each equipment bonus type adds to
+MODIFIABLE_STATS = ("max_hp", "attack", "defense")
+BONUS_STATS = {"hp": "max_hp", "attack": "attack", "defense": "defense"}
+
+ELIXIR_SOURCE = "Strength Elixir"
+
+
+Equipment = namedtuple("Equipment", ["name", "slot", "bonus_type", "bonus_value", "cost"])
+
+# Equipment sold in the village shop, by item name
+EQUIPMENT = {
+    "Steel Sword": Equipment("Steel Sword", "weapon", "attack", 10, 100),
+    "Iron Helmet": Equipment("Iron Helmet", "helmet", "defense", 5, 120),
+    "Chainmail Armor": Equipment("Chainmail Armor", "chest", "defense", 8, 200),
+    "Leather Boots": Equipment("Leather Boots", "boots", "defense", 3, 80)
+}
+
+
+class Modifier:
+    """A bonus to one stat from one source (an equipment slot, a buff, loot)
+    
+    Timed modifiers count down once per combat turn and are removed when
+    they reach zero; turns=None lasts until removed.
+    """
+    
+    __slots__ = ("source", "stat", "value", "turns")
+    
+    def __init__(self, source, stat, value, turns=None):
+        self.source = source
+        self.stat = stat
+        self.value = value
+        self.turns = turns
+    
+    def state(self):
+        """Modifier as a plain tuple"""
+        return (self.source, self.stat, self.value, self.turns)
+
 
 class Player:
     """Player character class"""
     
+    # Slotted to keep simulations that hold many players small:
+    # ~620 bytes per fresh Player with __dict__, ~530 with __slots__
+    # (most of what is left is the armor dict and the inventory).
+    #
+    # max_hp, attack and defense are cached totals of the base_* stats plus
+    # every modifier. They are recomputed only when a modifier or base stat
+    # changes, so combat reads them as plain attributes.
+    __slots__ = (
+        "level", "hp", "max_hp", "attack", "defense", "gold", "exp", "exp_needed",
+        "inventory", "armor", "defeated_bosses",
+        "base_max_hp", "base_attack", "base_defense", "modifiers", "timed_modifiers"
+    )
+    
     def __init__(self):
         self.level = 1
         self.hp = 100
-        self.max_hp = 100
-        self.attack = 10
-        self.defense = 5
+        self.base_max_hp = self.max_hp = 100
+        self.base_attack = self.attack = 10
+        self.base_defense = self.defense = 5
+        self.modifiers = {}
+        self.timed_modifiers = 0
         self.gold = 20
         self.exp = 0
-        self.exp_needed = 100
-        self.inventory = []
+        self.exp_needed = FIRST_EXP_NEEDED
+        self.inventory = Inventory()
         self.armor = {
             "helmet": None,
             "chest": None,
@@ -26,6 +296,119 @@ class Player:
         }
         self.defeated_bosses = []
     
+    def state(self):
+        """Player state as plain Python values"""
+        return {
+            "level": self.level,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "attack": self.attack,
+            "defense": self.defense,
+            "gold": self.gold,
+            "exp": self.exp,
+            "exp_needed": self.exp_needed,
+            "inventory": dict(self.inventory.counts),
+            "armor": dict(self.armor),
+            "defeated_bosses": list(self.defeated_bosses),
+            "modifiers": [modifier.state() for modifier in self.modifiers.values()]
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a player from state()
+        
+        The stat fields hold totals; the base stats are what is left after
+        taking the saved modifiers back off. States from before modifiers
+        existed only name the equipped items, so their slot modifiers are
+        rebuilt from EQUIPMENT.
+        """
+        player = cls()
+        for key, value in state.items():
+            if key != "modifiers":
+                setattr(player, key, value)
+        
+        player.inventory = Inventory.from_counts(state["inventory"])
+        player.armor = dict(state["armor"])
+        player.defeated_bosses = list(state["defeated_bosses"])
+        
+        modifiers = state.get("modifiers")
+        if modifiers is None:
+            modifiers = [
+                (slot, BONUS_STATS[EQUIPMENT[item].bonus_type], EQUIPMENT[item].bonus_value, None)
+                for slot, item in player.armor.items() if item in EQUIPMENT
+            ]
+        
+        player.base_max_hp, player.base_attack, player.base_defense = player.max_hp, player.attack, player.defense
+        for source, stat, value, turns in modifiers:
+            player.modifiers[source] = Modifier(source, stat, value, turns)
+            setattr(player, f"base_{stat}", getattr(player, f"base_{stat}") - value)
+        
+        player.refresh_stats()
+        return player
+    
+    # ========== MODIFIERS ==========
+    
+    def refresh_stats(self):
+        """Recompute the cached stat totals from the base stats and modifiers"""
+        totals = {"max_hp": self.base_max_hp, "attack": self.base_attack, "defense": self.base_defense}
+        timed = 0
+        
+        for modifier in self.modifiers.values():
+            totals[modifier.stat] += modifier.value
+            if modifier.turns is not None:
+                timed += 1
+        
+        self.max_hp = totals["max_hp"]
+        self.attack = totals["attack"]
+        self.defense = totals["defense"]
+        self.timed_modifiers = timed
+        
+        if self.hp > self.max_hp:
+            self.hp = self.max_hp
+    
+    def add_modifier(self, source, stat, value, turns=None):
+        """Add a modifier, replacing any other from the same source"""
+        if stat not in MODIFIABLE_STATS:
+            raise ValueError(f"Unknown stat: {stat}")
+        
+        self.modifiers[source] = Modifier(source, stat, value, turns)
+        self.refresh_stats()
+    
+    def remove_modifier(self, source):
+        """Remove the modifier from a source, returning it (or None if there was none)"""
+        modifier = self.modifiers.pop(source, None)
+        if modifier is not None:
+            self.refresh_stats()
+        return modifier
+    
+    def modifier_value(self, source):
+        """Value of the modifier from a source, or 0"""
+        modifier = self.modifiers.get(source)
+        return modifier.value if modifier is not None else 0
+    
+    def modifier_turns(self, source):
+        """Turns left on a timed modifier, or 0"""
+        modifier = self.modifiers.get(source)
+        return (modifier.turns or 0) if modifier is not None else 0
+    
+    def tick_modifiers(self):
+        """Count down timed modifiers by one turn, returning the sources that ran out"""
+        if not self.timed_modifiers:
+            return ()
+        
+        expired = []
+        for modifier in self.modifiers.values():
+            if modifier.turns is not None:
+                modifier.turns -= 1
+                if modifier.turns <= 0:
+                    expired.append(modifier.source)
+        
+        if expired:
+            for source in expired:
+                del self.modifiers[source]
+            self.refresh_stats()
+        return expired
+    
     def take_damage(self, damage):
         """Take damage reduced by defense"""
         
@@ -40,71 +423,90 @@ class Player:
         """Heal HP up to max"""
         self.hp = min(self.hp + amount, self.max_hp)
     
-    def gain_exp(self, amount):
-        """Gain experience and level up if needed"""
+    def gain_exp(self, amount, events=None):
+        """Gain experience and level up if needed (appending CombatEvents to events, if given)"""
         
         self.exp += amount
-        messages = [f"✨ +{amount} EXP"]
-        
-        while self.exp >= self.exp_needed:
-            messages.extend(self.level_up())
+        if events is not None:
+            events.append(CombatEvent("exp", "player", amount, None))
         
-        return messages
+        if self.exp >= self.exp_needed:
+            level, self.exp = LEVELS.level_for(LEVELS.total_exp(self.level) + self.exp)
+            self.advance_levels(level - self.level, events)
     
-    def level_up(self):
+    def level_up(self, events=None):
         """Level up and increase stats"""
         
-        self.level += 1
         self.exp -= self.exp_needed
-        self.exp_needed = int(self.exp_needed * 1.5)
+        self.advance_levels(1, events)
+    
+    def advance_levels(self, levels, events=None):
+        """Apply several levels' stat gains at once, with one summarized message"""
+        if levels <= 0:
+            return
+        
+        self.level += levels
+        self.exp_needed = LEVELS.exp_needed(self.level)
         
-        self.max_hp += 20
+        self.base_max_hp += LEVEL_HP * levels
+        self.base_attack += LEVEL_ATTACK * levels
+        self.base_defense += LEVEL_DEFENSE * levels
+        
+        self.refresh_stats()
         self.hp = self.max_hp
         
-        self.attack += 5
-        self.defense += 2
-        return [
-            f"🎉 LEVEL UP! Now level {self.level}!",
-            "Max HP +20, Attack +5, Defense +2"
-        ]
+        if events is not None:
+            events.append(CombatEvent("level_up", "player", self.level, None))
+            events.append(CombatEvent(
+                "level_stats", "player", (LEVEL_HP * levels, LEVEL_ATTACK * levels, LEVEL_DEFENSE * levels), None
+            ))
+    
+    @classmethod
+    def at_level(cls, level):
+        """Fresh player with the stats of the given level and no EXP into it"""
+        player = cls()
+        player.advance_levels(level - player.level)
+        return player
     
     def equip_armor(self, item_name, slot, bonus_type, bonus_value):
-        """Equip armor and apply bonuses"""
+        """Equip armor and apply its bonus, swapping out (and returning) whatever was in the slot"""
+        previous = self.unequip(slot)
+        
         self.armor[slot] = item_name
-        if bonus_type == "defense":
-            
-            self.defense += bonus_value
-        elif bonus_type == "attack":
-            self.attack += bonus_value
-            
-        elif bonus_type == "hp":
-            self.max_hp += bonus_value
+        self.add_modifier(slot, BONUS_STATS[bonus_type], bonus_value)
+        
+        if bonus_type == "hp":
             self.hp += bonus_value
+        return previous
+    
+    def unequip(self, slot):
+        """Move the item in a slot back to the inventory and drop its bonus, returning the item name (or None)"""
+        item_name = self.armor[slot]
+        if item_name is None:
+            return None
+        
+        self.armor[slot] = None
+        self.remove_modifier(slot)
+        
+        self.inventory.add(item_name)
+        return item_name
     
     def has_item(self, item_name):
         """Check if player has an item"""
-        return item_name in self.inventory
+        return self.inventory.has(item_name)
     
     def use_item(self, item_name):
         """Use and remove an item from inventory"""
-        if item_name in self.inventory:
-            self.inventory.remove(item_name)
-            
-            return True
-        return False
+        return self.inventory.use(item_name)
     
     def add_item(self, item_name):
         """Add item to inventory"""
         
-        self.inventory.append(item_name)
+        self.inventory.add(item_name)
     
     def get_inventory_count(self):
-        """Get inventory with item counts"""
-        inv_count = {}
-        
-        for item in self.inventory:
-            inv_count[item] = inv_count.get(item, 0) + 1
-        return inv_count
+        """Get inventory with item counts (read-only live view)"""
+        return self.inventory.view
     
     def has_defeated_boss(self, boss_name):
         """Check if boss has been defeated"""
@@ -121,6 +523,9 @@ class Player:
 class Enemy:
     """Enemy character class"""
     
+    # ~150 bytes per Enemy with __dict__, ~100 with __slots__
+    __slots__ = ("name", "hp", "max_hp", "attack", "defense", "gold_reward", "exp_reward", "boss")
+    
     def __init__(self, name, hp, attack, defense, gold_reward, exp_reward, boss=False):
         self.name = name
         self.hp = hp
@@ -133,6 +538,20 @@ class Enemy:
         
         self.boss = boss
     
+    def state(self):
+        """Enemy state as a flat tuple"""
+        return (self.name, self.hp, self.max_hp, self.attack, self.defense,
+                self.gold_reward, self.exp_reward, self.boss)
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an enemy from state()"""
+        name, hp, max_hp, attack, defense, gold_reward, exp_reward, boss = state
+        
+        enemy = cls(name, max_hp, attack, defense, gold_reward, exp_reward, boss)
+        enemy.hp = hp
+        return enemy
+    
     def take_damage(self, damage):
         """Take damage reduced by defense"""
         actual_damage = max(1, damage - self.defense)
@@ -148,159 +567,358 @@ class Enemy:
         
         return self.hp > 0
     
-    def attack_player(self):
-        """Calculate attack damage"""
+    def attack_player(self, roll=None):
+        """Calculate attack damage (roll is 0..3, drawn here if not given)"""
+        if roll is None:
+            roll = random.randint(0, 3)
         
-        return self.attack + random.randint(0, 3)
+        return self.attack + roll
+
+
+EnemyTemplate = namedtuple(
+    "EnemyTemplate",
+    ["name", "hp", "attack", "defense", "gold_reward", "exp_reward", "boss"],
+    defaults=[False]
+)
+
+
+class EnemyRegistry:
+    """Immutable enemy templates plus a free-list of reusable Enemy instances"""
+    
+    def __init__(self, templates=None, pool_size=256):
+        self.templates = dict(templates or {})
+        self.pool = []
+        
+        self.pool_size = pool_size
+    
+    def register(self, enemy_type, *args, **kwargs):
+        """Add or replace an enemy template"""
+        self.templates[enemy_type] = EnemyTemplate(*args, **kwargs)
+    
+    def load(self, path):
+        """Add templates from a JSON file of {enemy_type: {name, hp, attack, ...}}"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        
+        for enemy_type, stats in data.items():
+            self.register(enemy_type, **stats)
+    
+    def create(self, enemy_type):
+        """Spawn an enemy from its template, reusing a pooled instance if one is free"""
+        template = self.templates.get(enemy_type)
+        if template is None:
+            return None
+        
+        if self.pool:
+            enemy = self.pool.pop()
+            enemy.__init__(*template)
+            return enemy
+        return Enemy(*template)
+    
+    def release(self, enemy):
+        """Return an enemy for reuse - it must not be used again by the caller"""
+        if enemy is not None and len(self.pool) < self.pool_size:
+            self.pool.append(enemy)
+    
+    def types(self):
+        """All registered enemy types"""
+        return list(self.templates)
+
+
+ENEMY_REGISTRY = EnemyRegistry({
+    "dire_wolf": EnemyTemplate("Dire Wolf", 35, 7, 2, 40, 40),
+    "alpha_wolf": EnemyTemplate("Alpha Wolf", 50, 10, 3, 60, 60),
+    "goblin": EnemyTemplate("Goblin Warrior", 40, 8, 1, 60, 50),
+    "cave_troll": EnemyTemplate("Cave Troll", 60, 12, 4, 80, 70),
+    "bandit_scout": EnemyTemplate("Bandit Scout", 45, 9, 2, 70, 55),
+    "wild_boar": EnemyTemplate("Wild Boar", 40, 8, 3, 50, 45),
+    "rogue_merc": EnemyTemplate("Rogue Mercenary", 50, 11, 2, 80, 60),
+    
+    "bandit_thug": EnemyTemplate("Bandit Thug", 45, 10, 2, 70, 60),
+    "bandit_archer": EnemyTemplate("Bandit Archer", 40, 12, 1, 75, 65),
+    "bandit_leader": EnemyTemplate("Bandit Leader", 80, 14, 3, 200, 150, boss=True),
+    "mountain_troll": EnemyTemplate("Mountain Troll", 70, 13, 5, 90, 80),
+    
+    "troll_king": EnemyTemplate("Troll King", 100, 16, 6, 250, 180, boss=True),
+    "skeleton": EnemyTemplate("Skeleton Warrior", 50, 11, 2, 80, 70),
+    "zombie": EnemyTemplate("Zombie Knight", 60, 13, 4, 90, 80),
+    "wraith": EnemyTemplate("Shadow Wraith", 90, 15, 3, 300, 200, boss=True),
+    "dragon": EnemyTemplate("Ancient Dragon", 120, 18, 5, 500, 250, boss=True)
+})
+
+
+# Names of the GameEngine methods recorded by an attached journal, indexed by action code
+JOURNALED_ACTIONS = []
+
+
+def journaled(method):
+    """Record calls to a GameEngine action in the engine's journal, and report
+    them to its telemetry sink, if either is attached
+
+    Only decorate top-level actions - methods they call internally
+    (enemy_attack, handle_victory) are replayed as part of them.
+    """
+    code = len(JOURNALED_ACTIONS)
+    JOURNALED_ACTIONS.append(method.__name__)
+    signature = inspect.signature(method)
+    
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        journal = self.journal
+        telemetry = self.telemetry
+        if journal is None and telemetry is None:
+            return method(self, *args, **kwargs)
+        
+        # Records are positional, so keyword arguments are bound to their positions
+        if kwargs:
+            args = signature.bind(self, *args, **kwargs).args[1:]
+        
+        if journal is not None:
+            journal.record(self, code, args)
+        before = telemetry.before(self) if telemetry is not None else None
+        
+        try:
+            result = method(self, *args)
+        except BaseException:
+            # Drop the record, and snapshot whatever the action changed before it failed
+            if journal is not None:
+                journal.abort(self)
+            raise
+        
+        if journal is not None:
+            journal.confirm(self)
+        if telemetry is not None:
+            telemetry.after(self, code, args, before)
+        return result
+    
+    return wrapper
 
 
 class GameEngine:
-    """Main game engine that manages game state and logic"""
+    """Main game engine that manages game state and logic
     
-    def __init__(self):
+    Combat actions return lists of CombatEvent records; str() of an event
+    gives its display text. A quiet engine (for simulation and replay)
+    creates no events at all and its actions return NO_EVENTS.
+    """
+    
+    def __init__(self, seed=None, quiet=False):
+        self.quiet = quiet
         self.player = Player()
         self.current_enemy = None
         
-        self.strength_boost = 0
-        
-        self.strength_turns = 0
         self.quest_chain = []
         self.quest_callback = None
+        
+        self.journal = None
+        self.telemetry = None
+        self.seed(seed)
+    
+    def seed(self, seed=None):
+        """Give the engine a fresh RNG stream (a GameRNG or a seed value)"""
+        self.rng = seed if isinstance(seed, GameRNG) else GameRNG(seed)
+        
+        # Rolls are pre-drawn per kind so combat doesn't pay a randint call each turn
+        self.attack_rolls = self.rng.roller(0, 5)
+        self.counter_rolls = self.rng.roller(0, 3)
+        self.brace_rolls = self.rng.roller(0, 2)
+        
+        # A journal can't replay across a reseed, so replay restarts from a snapshot here
+        if self.journal is not None:
+            self.journal.barrier(self)
+    
+    @property
+    def strength_boost(self):
+        """Attack bonus from an active Strength Elixir"""
+        return self.player.modifier_value(ELIXIR_SOURCE)
     
+    @property
+    def strength_turns(self):
+        """Turns left on an active Strength Elixir"""
+        return self.player.modifier_turns(ELIXIR_SOURCE)
+    
+    def snapshot(self):
+        """Full engine state as plain Python values (no UI callbacks)"""
+        return {
+            "player": self.player.state(),
+            "current_enemy": self.current_enemy.state() if self.current_enemy else None,
+            "strength_boost": self.strength_boost,
+            "strength_turns": self.strength_turns,
+            "quest_chain": [enemy.state() for enemy in self.quest_chain],
+            
+            "rng_seed": self.rng.base_seed,
+            "rng_state": self.rng.getstate(),
+            "rolls": [buffer.pending() for buffer in (self.attack_rolls, self.counter_rolls, self.brace_rolls)]
+        }
+    
+    def restore(self, state):
+        """Load state produced by snapshot()"""
+        self.player = Player.from_state(state["player"])
+        
+        enemy = state["current_enemy"]
+        self.current_enemy = Enemy.from_state(enemy) if enemy else None
+        
+        # States without modifiers (old saves) carry the elixir only in these fields
+        if "modifiers" not in state["player"] and state["strength_turns"] > 0:
+            self.player.add_modifier(ELIXIR_SOURCE, "attack", state["strength_boost"], state["strength_turns"])
+        self.quest_chain = [Enemy.from_state(enemy) for enemy in state["quest_chain"]]
+        
+        # Save files leave the RNG out, in which case the current stream is kept
+        if "rng_state" in state:
+            self.rng = GameRNG(state["rng_seed"])
+            self.rng.setstate(state["rng_state"])
+            self.attack_rolls = self.rng.roller(0, 5)
+            self.counter_rolls = self.rng.roller(0, 3)
+            self.brace_rolls = self.rng.roller(0, 2)
+            
+            for buffer, rolls in zip((self.attack_rolls, self.counter_rolls, self.brace_rolls), state["rolls"]):
+                buffer.restore(rolls)
+        
+        # Nor across a restore
+        if self.journal is not None:
+            self.journal.barrier(self)
+    
+    @journaled
     def reset_game(self):
         """Reset game to initial state"""
         self.player = Player()
         self.current_enemy = None
         
-        self.strength_boost = 0
-        self.strength_turns = 0
-        
         self.quest_chain = []
         self.quest_callback = None
     
+    @journaled
     def start_combat(self, enemy):
         """Initialize combat with an enemy"""
         self.current_enemy = enemy
-        self.strength_boost = 0
         
-        self.strength_turns = 0
+        self.player.remove_modifier(ELIXIR_SOURCE)
         return f"A {enemy.name} appears!{' 💀 BOSS BATTLE 💀' if enemy.boss else ''}"
     
+    @journaled
     def player_attack(self):
         """Execute player attack"""
         if not self.current_enemy or not self.current_enemy.is_alive():
             
-            return []
+            return NO_EVENTS
         
-        total_attack = self.player.attack + self.strength_boost
+        events = None if self.quiet else []
         
-        damage = total_attack + random.randint(0, 5)
+        # player.attack already includes equipment and any elixir
+        damage = self.player.attack + self.attack_rolls.next()
         actual_damage = self.current_enemy.take_damage(damage)
         
-        messages = [f"💥 You dealt {actual_damage} damage!"]
+        if events is not None:
+            events.append(CombatEvent("hit", "player", actual_damage, None))
         
-        # Update strength boost
-        if self.strength_turns > 0:
-            self.strength_turns -= 1
-            if self.strength_turns == 0:
-                
-                self.strength_boost = 0
-                messages.append("⏳ Strength boost wore off!")
+        # Count down timed buffs
+        if self.player.timed_modifiers and self.player.tick_modifiers() and events is not None:
+            events.append(CombatEvent("boost_expired", "player", None, None))
         
         # Check if enemy defeated
         if not self.current_enemy.is_alive():
             
-            messages.extend(self.handle_victory())
-            return messages
+            self.handle_victory(events)
+            return events or NO_EVENTS
         
         # Enemy counterattack
-        messages.extend(self.enemy_attack())
+        self.enemy_attack(events)
         
-        return messages
+        return events or NO_EVENTS
     
+    @journaled
     def player_defend(self):
         """Execute player defend action"""
         
-        messages = ["🛡️ You brace for attack!"]
+        events = None if self.quiet else [CombatEvent("brace", "player", None, None)]
         
         if self.current_enemy and self.current_enemy.is_alive():
-            damage = max(1, self.current_enemy.attack // 2 + random.randint(0, 2))
+            damage = max(1, self.current_enemy.attack // 2 + self.brace_rolls.next())
             
             actual_damage = self.player.take_damage(damage)
-            messages.append(f"Reduced damage to {actual_damage}!")
+            if events is not None:
+                events.append(CombatEvent("braced_hit", self.current_enemy.name, actual_damage, None))
         
-        # Update strength boost
-        if self.strength_turns > 0:
-            self.strength_turns -= 1
+        # Count down timed buffs
+        if self.player.timed_modifiers and self.player.tick_modifiers() and events is not None:
             
-            if self.strength_turns == 0:
-                self.strength_boost = 0
-                messages.append("⏳ Strength boost wore off!")
+            events.append(CombatEvent("boost_expired", "player", None, None))
         
-        return messages
+        return events or NO_EVENTS
     
+    @journaled
     def use_health_potion(self):
         """Use health potion"""
+        events = None if self.quiet else []
+        
         if self.player.use_item("Health Potion"):
             
-            self.player.heal(40)
-            messages = ["🧪 Restored 40 HP!"]
+            self.player.heal(POTION_HEAL)
+            if events is not None:
+                events.append(CombatEvent("heal", "player", POTION_HEAL, "Health Potion"))
             
-            messages.extend(self.enemy_attack())
-            return messages
-        return ["❌ No Health Potions!"]
+            self.enemy_attack(events)
+        elif events is not None:
+            events.append(CombatEvent("no_item", "player", None, "Health Potion"))
+        return events or NO_EVENTS
     
+    @journaled
     def use_strength_elixir(self):
         """Use strength elixir"""
+        events = None if self.quiet else []
+        
         if self.player.use_item("Strength Elixir"):
-            self.strength_boost = 15
+            self.player.add_modifier(ELIXIR_SOURCE, "attack", ELIXIR_BOOST, ELIXIR_TURNS)
             
-            self.strength_turns = 3
-            messages = ["⚡ Attack +15 for 3 turns!"]
+            if events is not None:
+                events.append(CombatEvent("boost", "player", ELIXIR_BOOST, "Strength Elixir"))
             
-            messages.extend(self.enemy_attack())
-            return messages
-        return ["❌ No Strength Elixirs!"]
+            self.enemy_attack(events)
+        elif events is not None:
+            events.append(CombatEvent("no_item", "player", None, "Strength Elixir"))
+        return events or NO_EVENTS
     
-    def enemy_attack(self):
-        """Execute enemy attack"""
+    def enemy_attack(self, events=None):
+        """Execute enemy attack (appending a CombatEvent to events, if given)"""
         
         if not self.current_enemy or not self.current_enemy.is_alive():
-            return []
+            return
         
-        damage = self.current_enemy.attack_player()
+        damage = self.current_enemy.attack_player(self.counter_rolls.next())
         actual_damage = self.player.take_damage(damage)
         
-        return [f"💢 {self.current_enemy.name} dealt {actual_damage} damage!"]
+        if events is not None:
+            events.append(CombatEvent("enemy_hit", self.current_enemy.name, actual_damage, None))
     
-def handle_victory(self):
-    """Handle combat victory"""
-    messages = [f"🎊 Victory! +{self.current_enemy.gold_reward} gold"]
-    self.player.gold += self.current_enemy.gold_reward
+    def handle_victory(self, events=None):
+        """Handle combat victory"""
+        self.player.gold += self.current_enemy.gold_reward
+        if events is not None:
+            events.append(CombatEvent("gold", "player", self.current_enemy.gold_reward, None))
     
-    messages.extend(self.player.gain_exp(self.current_enemy.exp_reward))
+        self.player.gain_exp(self.current_enemy.exp_reward, events)
     
-    # Mark boss as defeated and give special loot
-    if self.current_enemy.boss:
+        # Mark boss as defeated and give special loot
+        if self.current_enemy.boss:
         
-        self.player.defeat_boss(self.current_enemy.name)
+            self.player.defeat_boss(self.current_enemy.name)
         
-        # Give boss-specific loot
-        boss_loot = {
-            "Bandit Leader": "Bandit's Trophy",
-            "Troll King": "Troll King's Crown",
+            # Give boss-specific loot
+            boss_loot = {
+                "Bandit Leader": "Bandit's Trophy",
+                "Troll King": "Troll King's Crown",
             
-            "Shadow Wraith": "Wraith's Essence",
-            "Ancient Dragon": "Dragon Scale"
-        }
+                "Shadow Wraith": "Wraith's Essence",
+                "Ancient Dragon": "Dragon Scale"
+            }
         
-        if self.current_enemy.name in boss_loot:
-            loot_item = boss_loot[self.current_enemy.name]
-            self.player.add_item(loot_item)
+            if self.current_enemy.name in boss_loot:
+                loot_item = boss_loot[self.current_enemy.name]
+                self.player.add_item(loot_item)
             
-            messages.append(f"🏆 Obtained {loot_item}!")
+                if events is not None:
+                    events.append(CombatEvent("loot", "player", None, loot_item))
     
-    return messages
     def is_combat_over(self):
         """Check if combat has ended"""
         
@@ -314,6 +932,7 @@ def handle_victory(self):
     
     # Story Events
     
+    @journaled
     def event_search_area(self):
         """Search area event"""
         self.player.gold += 50
@@ -321,6 +940,7 @@ def handle_victory(self):
         self.player.add_item("Old Map")
         return "You find 50 gold coins and an old map showing multiple paths!"
     
+    @journaled
     def event_find_potion(self):
         """Find potion event"""
         self.player.gold += 40
@@ -329,6 +949,7 @@ def handle_victory(self):
         self.player.add_item("Strength Elixir")
         return "The mushroom circle pulses with energy! You find a Health Potion, Strength Elixir, and 40 gold!"
     
+    @journaled
     def event_find_treasure(self):
         """Find treasure event"""
         self.player.gold += 150
@@ -339,6 +960,7 @@ def handle_victory(self):
         
         return "You discover a hidden treasure chamber! You find 150 gold, 2 Health Potions, and a Strength Elixir!"
     
+    @journaled
     def event_rest_inn(self):
         """Rest at inn"""
         if self.player.gold >= 20:
@@ -348,6 +970,7 @@ def handle_victory(self):
             return "You rest at the inn and fully restore your health!"
         return "❌ Not enough gold! (20 gold needed)"
     
+    @journaled
     def buy_item(self, item_name, cost):
         """Buy consumable item"""
         if self.player.gold >= cost:
@@ -357,18 +980,42 @@ def handle_victory(self):
             return f"✅ Purchased {item_name}!"
         return "❌ Not enough gold!"
     
+    @journaled
     def buy_armor(self, item_name, slot, bonus_type, bonus_value, cost):
-        """Buy and equip armor"""
-        if self.player.armor[slot]:
+        """Buy and equip armor, moving anything else in the slot to the inventory"""
+        if self.player.armor[slot] == item_name:
             
-            return f"❌ You already have {slot} equipped!"
+            return f"❌ You already have {item_name} equipped!"
+        if self.player.has_item(item_name):
+            return f"❌ You already own {item_name}!"
         if self.player.gold >= cost:
             self.player.gold -= cost
             
-            self.player.equip_armor(item_name, slot, bonus_type, bonus_value)
-            return f"✅ Equipped {item_name}! {bonus_type} +{bonus_value}"
+            previous = self.player.equip_armor(item_name, slot, bonus_type, bonus_value)
+            replaced = f" (replaced {previous})" if previous else ""
+            return f"✅ Equipped {item_name}{replaced}! {bonus_type} +{bonus_value}"
         return "❌ Not enough gold!"
     
+    @journaled
+    def unequip_armor(self, slot):
+        """Take off the armor in a slot"""
+        item_name = self.player.unequip(slot)
+        if item_name is None:
+            return f"❌ Nothing equipped in {slot}!"
+        return f"Removed {item_name}."
+    
+    @journaled
+    def equip_item(self, item_name):
+        """Equip a piece of equipment from the inventory"""
+        equipment = EQUIPMENT.get(item_name)
+        if equipment is None or not self.player.use_item(item_name):
+            return f"❌ You don't have {item_name}!"
+        
+        previous = self.player.equip_armor(item_name, equipment.slot, equipment.bonus_type, equipment.bonus_value)
+        replaced = f" (replaced {previous})" if previous else ""
+        return f"✅ Equipped {item_name}{replaced}! {equipment.bonus_type} +{equipment.bonus_value}"
+    
+    @journaled
     def complete_boss(self, boss_name, loot):
         """Complete boss and give loot"""
         self.player.defeat_boss(boss_name)
@@ -381,37 +1028,23 @@ def handle_victory(self):
     @staticmethod
     def create_enemy(enemy_type):
         """Factory method to create enemies"""
-        enemies = {
-            "dire_wolf": Enemy("Dire Wolf", 35, 7, 2, 40, 40),
-            "alpha_wolf": Enemy("Alpha Wolf", 50, 10, 3, 60, 60),
-            "goblin": Enemy("Goblin Warrior", 40, 8, 1, 60, 50),
-            "cave_troll": Enemy("Cave Troll", 60, 12, 4, 80, 70),
-            "bandit_scout": Enemy("Bandit Scout", 45, 9, 2, 70, 55),
-            "wild_boar": Enemy("Wild Boar", 40, 8, 3, 50, 45),
-            "rogue_merc": Enemy("Rogue Mercenary", 50, 11, 2, 80, 60),
-            
-            "bandit_thug": Enemy("Bandit Thug", 45, 10, 2, 70, 60),
-            "bandit_archer": Enemy("Bandit Archer", 40, 12, 1, 75, 65),
-            "bandit_leader": Enemy("Bandit Leader", 80, 14, 3, 200, 150, boss=True),
-            "mountain_troll": Enemy("Mountain Troll", 70, 13, 5, 90, 80),
-            
-            "troll_king": Enemy("Troll King", 100, 16, 6, 250, 180, boss=True),
-            "skeleton": Enemy("Skeleton Warrior", 50, 11, 2, 80, 70),
-            "zombie": Enemy("Zombie Knight", 60, 13, 4, 90, 80),
-            "wraith": Enemy("Shadow Wraith", 90, 15, 3, 300, 200, boss=True),
-            "dragon": Enemy("Ancient Dragon", 120, 18, 5, 500, 250, boss=True)
-        }
-        return enemies.get(enemy_type)
+        return ENEMY_REGISTRY.create(enemy_type)
     
     @staticmethod
-    def get_random_outskirts_enemy():
+    def release_enemy(enemy):
+        """Hand a finished enemy back to the spawn pool"""
+        ENEMY_REGISTRY.release(enemy)
+    
+    @journaled
+    def get_random_outskirts_enemy(self):
         """Get random enemy for outskirts"""
         enemy_types = ["bandit_scout", "wild_boar", "rogue_merc"]
         
-        return GameEngine.create_enemy(random.choice(enemy_types))
+        return self.create_enemy(self.rng.choice(enemy_types))
     
     # Quest Chains
     
+    @journaled
     def setup_bandit_quest(self):
         """Setup bandit quest chain"""
         self.quest_chain = [
@@ -421,6 +1054,7 @@ def handle_victory(self):
             self.create_enemy("bandit_leader")
         ]
     
+    @journaled
     def setup_troll_quest(self):
         """Setup troll quest chain"""
         self.quest_chain = [
@@ -429,6 +1063,7 @@ def handle_victory(self):
             self.create_enemy("troll_king")
         ]
     
+    @journaled
     def setup_castle_quest(self):
         """Setup castle quest chain"""
         self.quest_chain = [
@@ -438,6 +1073,7 @@ def handle_victory(self):
             self.create_enemy("wraith")
         ]
     
+    @journaled
     def setup_dragon_quest(self):
         """Setup dragon quest"""
         self.quest_chain = [self.create_enemy("dragon")]
@@ -447,6 +1083,7 @@ def handle_victory(self):
         
         return len(self.quest_chain) > 0
     
+    @journaled
     def get_next_quest_enemy(self):
         """Get next enemy in quest chain"""
         if self.quest_chain:
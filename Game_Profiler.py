@@ -0,0 +1,239 @@
+"""
+game_profiler.py
+Frame profiler - Per-phase frame timings, rolling histograms, allocation sampling and cProfile dumps
+"""
+
+import cProfile
+import os
+import time
+import tracemalloc
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+
+
+# Upper edges (ms) of the histogram buckets; the last bucket is everything slower
+BUCKET_EDGES_MS = (1, 2, 4, 8, 16.7, 33.3, 66.7)
+
+WINDOW = 300           # frames kept for the rolling statistics
+ALLOC_SAMPLE_EVERY = 60  # trace allocations on one frame in this many
+PROFILE_FRAMES = 120   # frames recorded by one cProfile capture
+
+
+class RollingHistogram:
+    """Times from the last `window` samples, bucketed by BUCKET_EDGES_MS
+
+    Bucket counts are kept up to date as samples enter and leave the
+    window, so reading the histogram never rescans it.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+
+    def add(self, ms):
+        """Add a sample, dropping the oldest once the window is full"""
+        if len(self.samples) == self.samples.maxlen:
+            self.counts[bisect_right(BUCKET_EDGES_MS, self.samples[0])] -= 1
+
+        self.samples.append(ms)
+        self.counts[bisect_right(BUCKET_EDGES_MS, ms)] += 1
+
+    def summary(self):
+        """mean / p50 / p95 / max over the window"""
+        if not self.samples:
+            return {"samples": 0}
+
+        times = sorted(self.samples)
+        return {
+            "samples": len(times),
+            "mean": sum(times) / len(times),
+            "p50": times[len(times) // 2],
+            "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "max": times[-1]
+        }
+
+
+class FrameProfiler:
+    """Times each phase of a frame and reports rolling statistics
+
+    Phases are timed by wrapping methods on an instance (instrument) or
+    explicitly with `with profiler.phase(name)`. Times are inclusive, so a
+    screen function's time contains its draw_* calls. Nothing is wrapped
+    until instrument() is called and uninstrument() puts the original
+    methods back, so a game that never profiles pays nothing.
+
+    Hooks are called after every timed frame with (frame number, frame ms,
+    {phase: ms}) - the place to log stutter or stream timings elsewhere.
+    """
+
+    def __init__(self, window=WINDOW, alloc_sample_every=ALLOC_SAMPLE_EVERY, dump_dir="profiles"):
+        self.window = window
+        self.frames = RollingHistogram(window)
+        self.phases = {}
+
+        self.current = {}
+        self.frame_start = None
+        self.frame_count = 0
+
+        self.hooks = []
+        self.wrapped = []
+
+        # Allocation sampling: (frame, live blocks allocated, peak bytes) per sampled frame
+        self.alloc_sample_every = alloc_sample_every
+        self.alloc_samples = deque(maxlen=32)
+        self.top_allocations = []
+        self.tracing = False
+
+        # cProfile capture
+        self.dump_dir = dump_dir
+        self.cprofile = None
+        self.profile_frames_left = 0
+        self.last_dump = None
+
+    # ========== HOOKS ==========
+
+    def add_hook(self, callback):
+        """Call callback(frame, frame_ms, phases) after every frame"""
+        self.hooks.append(callback)
+
+    def remove_hook(self, callback):
+        """Stop calling a hook"""
+        self.hooks.remove(callback)
+
+    def instrument(self, owner, names, prefix=""):
+        """Time every call to owner.<name> as phase prefix + name"""
+        for name in names:
+            method = getattr(owner, name)
+            setattr(owner, name, self._wrap(prefix + name, method))
+            self.wrapped.append((owner, name))
+
+    def uninstrument(self):
+        """Restore every wrapped method"""
+        for owner, name in self.wrapped:
+            delattr(owner, name)
+        self.wrapped = []
+
+    def _wrap(self, phase, method):
+        current = self.current
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current[phase] = current.get(phase, 0.0) + (clock() - start) * 1000
+
+        return timed
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of code as a phase of the current frame"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] = self.current.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    # ========== FRAMES ==========
+
+    def begin_frame(self):
+        """Mark the start of a frame's work (after any idle wait)"""
+        self.current.clear()
+
+        sample = self.alloc_sample_every and self.frame_count % self.alloc_sample_every == self.alloc_sample_every - 1
+        if sample and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracing = True
+
+        if self.profile_frames_left and self.cprofile is None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Mark the end of a frame's work and update the statistics"""
+        if self.frame_start is None:
+            return
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_start = None
+        self.frame_count += 1
+
+        # Tracing and cProfile slow a frame down several times over, so those
+        # frames are kept out of the timings
+        distorted = self.tracing or self.cprofile is not None
+
+        if self.tracing:
+            self._sample_allocations()
+
+        if self.cprofile is not None:
+            self.profile_frames_left -= 1
+            if self.profile_frames_left <= 0:
+                self.dump_profile()
+
+        if distorted:
+            return
+
+        self.frames.add(frame_ms)
+        for name, ms in self.current.items():
+            histogram = self.phases.get(name)
+            if histogram is None:
+                histogram = self.phases[name] = RollingHistogram(self.window)
+            histogram.add(ms)
+
+        for hook in self.hooks:
+            hook(self.frame_count, frame_ms, dict(self.current))
+
+    def _sample_allocations(self):
+        """Everything still traced was allocated during this frame"""
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.tracing = False
+
+        stats = snapshot.statistics("lineno")
+        self.alloc_samples.append((self.frame_count, sum(stat.count for stat in stats), peak))
+        self.top_allocations = [(str(stat.traceback[0]), stat.count, stat.size) for stat in stats[:5]]
+
+    def allocations(self):
+        """(mean live blocks allocated per sampled frame, mean peak bytes), or None before the first sample"""
+        if not self.alloc_samples:
+            return None
+
+        count = len(self.alloc_samples)
+        return (sum(sample[1] for sample in self.alloc_samples) / count,
+                sum(sample[2] for sample in self.alloc_samples) / count)
+
+    def stats(self):
+        """Rolling summary of the frame and every phase, slowest phase (p95) first"""
+        phases = {name: histogram.summary() for name, histogram in self.phases.items()}
+        return {
+            "frames": self.frame_count,
+            "frame": self.frames.summary(),
+            "histogram": list(self.frames.counts),
+            "phases": dict(sorted(phases.items(), key=lambda item: -item[1]["p95"])),
+            "allocations": self.allocations(),
+            "top_allocations": self.top_allocations
+        }
+
+    # ========== CPROFILE ==========
+
+    def capture(self, frames=PROFILE_FRAMES):
+        """Run cProfile over the next `frames` frames, then dump it"""
+        if self.cprofile is None:
+            self.profile_frames_left = frames
+
+    def dump_profile(self):
+        """Write the capture as a pstats file (snakeviz, flameprof and gprof2dot read it)"""
+        self.cprofile.disable()
+
+        os.makedirs(self.dump_dir, exist_ok=True)
+        path = os.path.join(self.dump_dir, time.strftime("frames-%Y%m%d-%H%M%S.prof"))
+        self.cprofile.dump_stats(path)
+
+        self.cprofile = None
+        self.profile_frames_left = 0
+        self.last_dump = path
+        return path
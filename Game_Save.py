@@ -0,0 +1,326 @@
+"""
+game_save.py
+Save games - Compact versioned binary save slots with a background autosaver
+"""
+
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+
+SAVE_MAGIC = b"RPGSAV"
+SAVE_VERSION = 2
+READABLE_VERSIONS = (1, 2)  # version 1 has no stat modifiers
+
+# Fixed-size header so a load menu can list slots without reading payloads:
+# magic, version, saved_at, level, gold, hp, max_hp, bosses defeated, label, payload size, payload crc32
+HEADER = struct.Struct("<6sHdHIIIB32sII")
+
+PLAYER_STATS = ("level", "hp", "max_hp", "attack", "defense", "gold", "exp", "exp_needed")
+PLAYER_STRUCT = struct.Struct("<8i")
+ENEMY_STRUCT = struct.Struct("<6i?")
+STRENGTH_STRUCT = struct.Struct("<ii")
+MODIFIER_STRUCT = struct.Struct("<ii")  # value, turns (-1 for permanent)
+
+
+class SaveError(Exception):
+    """A save file is missing, corrupt or from an unknown version"""
+
+
+# ========== ENCODING ==========
+
+def _put_str(out, text):
+    data = (text or "").encode("utf-8")
+    out += struct.pack("<H", len(data))
+    out += data
+
+
+def _get_str(data, offset):
+    (size,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    return data[offset:offset + size].decode("utf-8"), offset + size
+
+
+def _put_enemy(out, enemy):
+    name, hp, max_hp, attack, defense, gold_reward, exp_reward, boss = enemy
+    _put_str(out, name)
+    out += ENEMY_STRUCT.pack(hp, max_hp, attack, defense, gold_reward, exp_reward, boss)
+
+
+def _get_enemy(data, offset):
+    name, offset = _get_str(data, offset)
+    values = ENEMY_STRUCT.unpack_from(data, offset)
+    return (name,) + values, offset + ENEMY_STRUCT.size
+
+
+def encode_state(state):
+    """Pack the saved parts of GameEngine.snapshot() into bytes"""
+    player = state["player"]
+    out = bytearray()
+
+    out += PLAYER_STRUCT.pack(*(player[stat] for stat in PLAYER_STATS))
+
+    out += struct.pack("<H", len(player["inventory"]))
+    for item, count in player["inventory"].items():
+        _put_str(out, item)
+        out += struct.pack("<H", count)
+
+    out += struct.pack("<B", len(player["armor"]))
+    for slot, item in player["armor"].items():
+        _put_str(out, slot)
+        _put_str(out, item)
+
+    out += struct.pack("<B", len(player["defeated_bosses"]))
+    for boss in player["defeated_bosses"]:
+        _put_str(out, boss)
+
+    out += struct.pack("<B", len(player["modifiers"]))
+    for source, stat, value, turns in player["modifiers"]:
+        _put_str(out, source)
+        _put_str(out, stat)
+        out += MODIFIER_STRUCT.pack(value, -1 if turns is None else turns)
+
+    out += STRENGTH_STRUCT.pack(state["strength_boost"], state["strength_turns"])
+
+    enemy = state["current_enemy"]
+    out += struct.pack("<?", enemy is not None)
+    if enemy is not None:
+        _put_enemy(out, enemy)
+
+    out += struct.pack("<B", len(state["quest_chain"]))
+    for enemy in state["quest_chain"]:
+        _put_enemy(out, enemy)
+
+    return bytes(out)
+
+
+def decode_state(data, version=SAVE_VERSION):
+    """Unpack bytes from encode_state() into a state GameEngine.restore() accepts"""
+    offset = 0
+    player = dict(zip(PLAYER_STATS, PLAYER_STRUCT.unpack_from(data, offset)))
+    offset += PLAYER_STRUCT.size
+
+    (count,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    player["inventory"] = {}
+    for _ in range(count):
+        item, offset = _get_str(data, offset)
+        (player["inventory"][item],) = struct.unpack_from("<H", data, offset)
+        offset += 2
+
+    (count,) = struct.unpack_from("<B", data, offset)
+    offset += 1
+    player["armor"] = {}
+    for _ in range(count):
+        slot, offset = _get_str(data, offset)
+        item, offset = _get_str(data, offset)
+        player["armor"][slot] = item or None
+
+    (count,) = struct.unpack_from("<B", data, offset)
+    offset += 1
+    player["defeated_bosses"] = []
+    for _ in range(count):
+        boss, offset = _get_str(data, offset)
+        player["defeated_bosses"].append(boss)
+
+    if version >= 2:
+        (count,) = struct.unpack_from("<B", data, offset)
+        offset += 1
+        player["modifiers"] = []
+        for _ in range(count):
+            source, offset = _get_str(data, offset)
+            stat, offset = _get_str(data, offset)
+            value, turns = MODIFIER_STRUCT.unpack_from(data, offset)
+            offset += MODIFIER_STRUCT.size
+            player["modifiers"].append((source, stat, value, None if turns < 0 else turns))
+
+    strength_boost, strength_turns = STRENGTH_STRUCT.unpack_from(data, offset)
+    offset += STRENGTH_STRUCT.size
+
+    (has_enemy,) = struct.unpack_from("<?", data, offset)
+    offset += 1
+    current_enemy = None
+    if has_enemy:
+        current_enemy, offset = _get_enemy(data, offset)
+
+    (count,) = struct.unpack_from("<B", data, offset)
+    offset += 1
+    quest_chain = []
+    for _ in range(count):
+        enemy, offset = _get_enemy(data, offset)
+        quest_chain.append(enemy)
+
+    return {
+        "player": player,
+        "current_enemy": current_enemy,
+        "strength_boost": strength_boost,
+        "strength_turns": strength_turns,
+        "quest_chain": quest_chain
+    }
+
+
+def encode_save(state, label=""):
+    """Header + payload bytes for one save slot"""
+    payload = encode_state(state)
+    player = state["player"]
+
+    header = HEADER.pack(
+        SAVE_MAGIC, SAVE_VERSION, time.time(),
+        player["level"], player["gold"], player["hp"], player["max_hp"],
+        len(player["defeated_bosses"]), label.encode("utf-8")[:32],
+        len(payload), zlib.crc32(payload)
+    )
+    return header + payload
+
+
+# ========== FILES ==========
+
+def _parse_header(data, path):
+    if len(data) < HEADER.size:
+        raise SaveError(f"{path} is too short to be a save file")
+
+    magic, version, saved_at, level, gold, hp, max_hp, bosses, label, size, crc = HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC:
+        raise SaveError(f"{path} is not a save file")
+    if version not in READABLE_VERSIONS:
+        raise SaveError(f"{path} has unsupported save version {version}")
+
+    return {
+        "path": path,
+        "version": version,
+        "saved_at": saved_at,
+        "level": level,
+        "gold": gold,
+        "hp": hp,
+        "max_hp": max_hp,
+        "bosses_defeated": bosses,
+        "label": label.rstrip(b"\0").decode("utf-8", "replace"),
+        "payload_size": size,
+        "crc": crc
+    }
+
+
+def read_header(path):
+    """Read only the fixed-size header of a save slot"""
+    with open(path, "rb") as f:
+        return _parse_header(f.read(HEADER.size), path)
+
+
+def list_saves(directory):
+    """Headers of every readable save in a directory, newest first"""
+    if not os.path.isdir(directory):
+        return []
+
+    headers = []
+    for name in os.listdir(directory):
+        if not name.endswith(".sav"):
+            continue
+        try:
+            headers.append(read_header(os.path.join(directory, name)))
+        except (OSError, SaveError):
+            continue
+
+    headers.sort(key=lambda header: header["saved_at"], reverse=True)
+    return headers
+
+
+def write_atomic(path, data):
+    """Write a file so readers only ever see the old or the new contents"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # A temp file of its own per call, so concurrent writers never share one
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def save_game(engine, path, label=""):
+    """Save an engine to a slot file (blocking)"""
+    write_atomic(path, encode_save(engine.snapshot(), label))
+
+
+def load_game(path, engine):
+    """Load a slot file into an engine"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    header = _parse_header(data, path)
+    payload = data[HEADER.size:HEADER.size + header["payload_size"]]
+
+    if len(payload) != header["payload_size"] or zlib.crc32(payload) != header["crc"]:
+        raise SaveError(f"{path} is corrupt")
+
+    engine.restore(decode_state(payload, header["version"]))
+    return header
+
+
+# ========== AUTOSAVE ==========
+
+class AutoSaver:
+    """Writes saves on a background thread so the game loop never waits on disk
+
+    The engine state is snapshotted on the caller's thread; encoding and the
+    atomic write happen on the worker. Repeated saves to the same slot
+    before the worker catches up are coalesced into the latest one.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+
+        self.running = True
+        self.saves_written = 0
+        self.last_error = None
+
+        self.thread = threading.Thread(target=self._worker, name="autosave", daemon=True)
+        self.thread.start()
+
+    def save(self, engine, path, label=""):
+        """Queue a save of the engine's current state"""
+        state = engine.snapshot()
+
+        with self.lock:
+            self.pending[path] = (state, label)
+        self.wake.set()
+
+    def _worker(self):
+        while True:
+            self.wake.wait()
+
+            with self.lock:
+                self.wake.clear()
+                jobs = self.pending
+                self.pending = {}
+                running = self.running
+
+            for path, (state, label) in jobs.items():
+                try:
+                    write_atomic(path, encode_save(state, label))
+                    self.saves_written += 1
+                except OSError as error:
+                    self.last_error = error
+
+            if not running:
+                return
+
+    def close(self):
+        """Flush queued saves and stop the worker"""
+        with self.lock:
+            self.running = False
+        self.wake.set()
+
+        self.thread.join()
@@ -0,0 +1,430 @@
+"""
+game_simulation.py
+Headless combat simulator - Runs batches of fights through GameEngine to check enemy balance
+"""
+
+import argparse
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from Game_Logic import Player, GameEngine, GameRNG, ENEMY_REGISTRY
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Fights that run this long are counted as losses so a defend-only policy can't hang a worker
+MAX_TURNS = 500
+
+
+# ========== POLICIES ==========
+
+def always_attack(engine):
+    """Attack every turn"""
+    return "attack"
+
+
+def defend_when_low(engine):
+    """Attack, but brace while the next enemy hit could be lethal"""
+    enemy = engine.current_enemy
+    worst_hit = max(1, enemy.attack + 3 - engine.player.defense)
+
+    if engine.player.hp <= worst_hit and enemy.hp > 1:
+        return "defend"
+    return "attack"
+
+
+POLICIES = {
+    "attack": always_attack,
+    "defend_low": defend_when_low
+}
+
+
+# ========== SINGLE FIGHT ==========
+
+def make_player(level):
+    """Create a fresh player already levelled up to the given level"""
+    return Player.at_level(level)
+
+
+def simulate_fight(enemy_type, level=1, policy=always_attack, engine=None):
+    """Play one fight to the end and return (won, turns, hp_left)
+
+    Pass a seeded engine to reuse its RNG stream across many fights.
+    """
+    engine = engine or GameEngine(quiet=True)
+    engine.reset_game()
+    engine.player = make_player(level)
+    engine.start_combat(GameEngine.create_enemy(enemy_type))
+
+    turns = 0
+    hp_left = engine.player.hp
+    while not engine.is_combat_over() and turns < MAX_TURNS:
+        # The killing blow can trigger a level up heal, so HP is sampled before each action
+        hp_left = engine.player.hp
+        if policy(engine) == "defend":
+            engine.player_defend()
+        else:
+            engine.player_attack()
+        turns += 1
+
+    won = engine.player_is_alive() and not engine.current_enemy.is_alive()
+    GameEngine.release_enemy(engine.current_enemy)
+
+    return won, turns, hp_left if won else engine.player.hp
+
+
+# ========== BATCH RUNS ==========
+
+def _run_chunk(enemy_type, template, level, policy_name, fights, seed):
+    """Worker entry point - simulate a chunk of fights and return histograms
+
+    The template travels with the job, so enemy types registered after the
+    worker's import (e.g. from EnemyRegistry.load) exist there too.
+    """
+    ENEMY_REGISTRY.register(enemy_type, *template)
+    engine = GameEngine(seed, quiet=True)
+    policy = POLICIES[policy_name]
+
+    wins = 0
+    turns_hist = Counter()
+    hp_hist = Counter()
+
+    for _ in range(fights):
+        won, turns, hp_left = simulate_fight(enemy_type, level, policy, engine)
+
+        turns_hist[turns] += 1
+        if won:
+            wins += 1
+            hp_hist[hp_left] += 1
+
+    return wins, turns_hist, hp_hist
+
+
+def _percentile(hist, total, pct):
+    """Read a percentile straight off a value -> count histogram"""
+    if total == 0:
+        return 0
+
+    target = pct / 100 * total
+    seen = 0
+    for value in sorted(hist):
+        seen += hist[value]
+        if seen >= target:
+            return value
+    return max(hist)
+
+
+def _summarize(enemy_type, fights, wins, turns_hist, hp_hist):
+    """Turn merged histograms into a report dict"""
+    won_fights = sum(hp_hist.values())
+
+    return {
+        "enemy": enemy_type,
+        "fights": fights,
+        "win_rate": wins / fights if fights else 0.0,
+        "mean_turns": sum(t * c for t, c in turns_hist.items()) / fights if fights else 0.0,
+        "p50_turns": _percentile(turns_hist, fights, 50),
+        "p90_turns": _percentile(turns_hist, fights, 90),
+        "p99_turns": _percentile(turns_hist, fights, 99),
+        "mean_hp_left": sum(h * c for h, c in hp_hist.items()) / won_fights if won_fights else 0.0,
+        "p10_hp_left": _percentile(hp_hist, won_fights, 10),
+        "p50_hp_left": _percentile(hp_hist, won_fights, 50)
+    }
+
+
+def run_batch(enemy_types=None, level=1, fights=100000, policy="attack",
+              workers=None, chunk_size=20000, seed=0):
+    """Simulate `fights` fights against each enemy type (default: every registered one) across a process pool"""
+    enemy_types = enemy_types or ENEMY_REGISTRY.types()
+    workers = workers or os.cpu_count() or 1
+
+    jobs = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for enemy_type in enemy_types:
+            # One independent RNG stream per chunk, so results don't depend on worker count
+            chunks = -(-fights // chunk_size)
+            streams = GameRNG(f"{seed}:{enemy_type}:{level}").split(chunks)
+
+            remaining = fights
+            for stream in streams:
+                size = min(chunk_size, remaining)
+                jobs.append((enemy_type, pool.submit(
+                    _run_chunk, enemy_type, ENEMY_REGISTRY.templates[enemy_type], level, policy, size, stream.base_seed
+                )))
+                remaining -= size
+
+        merged = {t: [0, Counter(), Counter()] for t in enemy_types}
+        for enemy_type, future in jobs:
+            wins, turns_hist, hp_hist = future.result()
+
+            totals = merged[enemy_type]
+            totals[0] += wins
+            totals[1].update(turns_hist)
+            totals[2].update(hp_hist)
+
+    return [_summarize(t, fights, *merged[t]) for t in enemy_types]
+
+
+# ========== ENTITY POOL ==========
+
+class EntityPool:
+    """Struct-of-arrays storage for many combatants, one typed array per stat
+
+    Entities are plain integer slots, so creating and recycling them never
+    allocates a Python object. Each entity costs 4 bytes per stat
+    (16 bytes for the default fields) against ~100 for a slotted Enemy
+    and ~530 for a Player.
+    """
+
+    FIELDS = ("hp", "max_hp", "attack", "defense")
+
+    def __init__(self, capacity=1024, fields=FIELDS):
+        self.fields = fields
+        self.stats = {field: array("i", bytes(4 * capacity)) for field in fields}
+        self.capacity = capacity
+
+        # Free slots are kept as a stack; the next never-used slot comes after
+        self.free = array("i")
+        self.next_slot = 0
+        self.live = 0
+
+        for field, column in self.stats.items():
+            setattr(self, field, column)
+
+    def _grow(self):
+        """Double every column"""
+        for column in self.stats.values():
+            column.frombytes(bytes(column.itemsize * self.capacity))
+        self.capacity *= 2
+
+    def create(self, **values):
+        """Claim a slot, fill its stats and return the slot index"""
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.next_slot == self.capacity:
+                self._grow()
+            slot = self.next_slot
+            self.next_slot += 1
+
+        for field in self.fields:
+            self.stats[field][slot] = values.get(field, 0)
+        if "max_hp" in self.stats and "max_hp" not in values:
+            self.stats["max_hp"][slot] = values.get("hp", 0)
+
+        self.live += 1
+        return slot
+
+    def create_from(self, entity):
+        """Copy a Player or Enemy into a new slot"""
+        return self.create(**{field: getattr(entity, field) for field in self.fields})
+
+    def release(self, slot):
+        """Return a slot to the pool for reuse"""
+        self.free.append(slot)
+        self.live -= 1
+
+    def take_damage(self, slot, damage):
+        """Same rule as Player.take_damage / Enemy.take_damage"""
+        actual_damage = max(1, damage - self.defense[slot])
+        self.hp[slot] = max(0, self.hp[slot] - actual_damage)
+
+        return actual_damage
+
+    def is_alive(self, slot):
+        """Check if the entity in a slot still has HP"""
+        return self.hp[slot] > 0
+
+    def __len__(self):
+        return self.live
+
+
+# ========== VECTORIZED BATCH ==========
+
+ACTION_ATTACK = 0
+ACTION_DEFEND = 1
+
+
+class BatchCombat:
+    """N player/enemy fights held as NumPy arrays and stepped in lockstep
+
+    Applies the same rules as GameEngine.player_attack / player_defend,
+    Player.take_damage, Enemy.take_damage and Enemy.attack_player.
+    Rewards, levelling and items are not modelled - only the fight itself.
+    """
+
+    def __init__(self, player, enemy, n, seed=None):
+        if np is None:
+            raise ImportError("BatchCombat needs numpy (pip install numpy)")
+
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        self.player_hp = np.full(n, player.hp, dtype=np.int32)
+        self.player_attack = np.full(n, player.attack, dtype=np.int32)
+        self.player_defense = np.full(n, player.defense, dtype=np.int32)
+
+        self.enemy_hp = np.full(n, enemy.hp, dtype=np.int32)
+        self.enemy_attack = np.full(n, enemy.attack, dtype=np.int32)
+        self.enemy_defense = np.full(n, enemy.defense, dtype=np.int32)
+
+        self.strength_boost = np.zeros(n, dtype=np.int32)
+        self.strength_turns = np.zeros(n, dtype=np.int32)
+        self.turns = np.zeros(n, dtype=np.int32)
+    
+    @classmethod
+    def from_enemy_type(cls, enemy_type, level, n, seed=None):
+        """Build a batch of n identical fights against one enemy type"""
+        return cls(make_player(level), GameEngine.create_enemy(enemy_type), n, seed)
+    
+    def active(self):
+        """Mask of fights that are still running"""
+        return (self.player_hp > 0) & (self.enemy_hp > 0) & (self.turns < MAX_TURNS)
+    
+    def step(self, actions=ACTION_ATTACK):
+        """Advance every active fight by one player action (scalar or per-fight array)"""
+        active = self.active()
+        if not active.any():
+            return active
+
+        actions = np.broadcast_to(actions, self.n)
+        attacking = active & (actions == ACTION_ATTACK)
+        defending = active & (actions == ACTION_DEFEND)
+
+        # Player attack -> Enemy.take_damage
+        roll = self.rng.integers(0, 6, self.n, dtype=np.int32)
+        damage = self.player_attack + self.strength_boost + roll
+        dealt = np.maximum(1, damage - self.enemy_defense)
+        self.enemy_hp = np.where(attacking, np.maximum(0, self.enemy_hp - dealt), self.enemy_hp)
+
+        # Enemy.attack_player -> Player.take_damage, only if the enemy survived the hit
+        roll = self.rng.integers(0, 4, self.n, dtype=np.int32)
+        counter = attacking & (self.enemy_hp > 0)
+        hit = self.enemy_attack + roll
+
+        # Braced hits use half attack plus a smaller roll
+        roll = self.rng.integers(0, 3, self.n, dtype=np.int32)
+        hit = np.where(defending, np.maximum(1, self.enemy_attack // 2 + roll), hit)
+
+        taken = np.maximum(1, hit - self.player_defense)
+        self.player_hp = np.where(counter | defending, np.maximum(0, self.player_hp - taken), self.player_hp)
+
+        # Strength boost ticks down on both actions
+        ticking = active & (self.strength_turns > 0)
+        self.strength_turns = np.where(ticking, self.strength_turns - 1, self.strength_turns)
+        self.strength_boost = np.where(ticking & (self.strength_turns == 0), 0, self.strength_boost)
+
+        self.turns += active
+        return active
+    
+    def run(self, policy=None):
+        """Step until every fight has ended; policy(batch) returns per-fight actions"""
+        while self.active().any():
+            self.step(ACTION_ATTACK if policy is None else policy(self))
+    
+    def won(self):
+        """Mask of fights the player won"""
+        return (self.player_hp > 0) & (self.enemy_hp == 0)
+    
+    def histograms(self):
+        """Return (wins, turns_hist, hp_hist) in the same shape as _run_chunk"""
+        won = self.won()
+
+        turns_hist = Counter(dict(enumerate(np.bincount(self.turns).tolist())))
+        hp_hist = Counter(dict(enumerate(np.bincount(self.player_hp[won]).tolist())))
+
+        return int(won.sum()), +turns_hist, +hp_hist
+
+
+def batch_defend_when_low(batch):
+    """Vectorized defend_when_low"""
+    worst_hit = np.maximum(1, batch.enemy_attack + 3 - batch.player_defense)
+    low = (batch.player_hp <= worst_hit) & (batch.enemy_hp > 1)
+
+    return np.where(low, ACTION_DEFEND, ACTION_ATTACK)
+
+
+BATCH_POLICIES = {
+    "attack": None,
+    "defend_low": batch_defend_when_low
+}
+
+
+def run_batch_vectorized(enemy_types=None, level=1, fights=100000, policy="attack",
+                         chunk_size=1000000, seed=0):
+    """Single-process equivalent of run_batch using BatchCombat"""
+    enemy_types = enemy_types or ENEMY_REGISTRY.types()
+    batch_policy = BATCH_POLICIES[policy]
+
+    results = []
+    for enemy_type in enemy_types:
+        totals = [0, Counter(), Counter()]
+        remaining = fights
+        # Seeded by enemy type as in run_batch, so a type's results don't
+        # depend on where it sits in the list
+        stream = GameRNG(f"{seed}:{enemy_type}:{level}")
+
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            batch = BatchCombat.from_enemy_type(enemy_type, level, size, stream.getrandbits(128))
+            batch.run(batch_policy)
+
+            wins, turns_hist, hp_hist = batch.histograms()
+            totals[0] += wins
+            totals[1].update(turns_hist)
+            totals[2].update(hp_hist)
+
+            remaining -= size
+
+        results.append(_summarize(enemy_type, fights, *totals))
+    return results
+
+
+def format_report(results, level):
+    """Format batch results as a text table"""
+    lines = [
+        f"Player level {level}",
+        f"{'Enemy':<16}{'Win %':>8}{'Turns':>8}{'p50':>6}{'p90':>6}{'p99':>6}{'HP left':>9}{'p10 HP':>8}"
+    ]
+
+    for r in results:
+        lines.append(
+            f"{r['enemy']:<16}{r['win_rate'] * 100:>7.2f}%{r['mean_turns']:>8.2f}"
+            f"{r['p50_turns']:>6}{r['p90_turns']:>6}{r['p99_turns']:>6}"
+            f"{r['mean_hp_left']:>9.1f}{r['p10_hp_left']:>8}"
+        )
+    return "\n".join(lines)
+
+
+# ========== RUN SIMULATION ==========
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless combat balance simulator")
+
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--fights", type=int, default=100000)
+    parser.add_argument("--enemy", action="append", help="enemy type to simulate (repeatable, default: all)")
+    parser.add_argument("--enemy-file", action="append", default=[], help="JSON enemy templates to register first")
+
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="attack")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vectorized", action="store_true", help="use the NumPy batch kernel")
+    args = parser.parse_args()
+
+    for path in args.enemy_file:
+        ENEMY_REGISTRY.load(path)
+    for enemy_type in args.enemy or ():
+        if enemy_type not in ENEMY_REGISTRY.templates:
+            parser.error(f"unknown enemy type {enemy_type!r} (choose from {', '.join(ENEMY_REGISTRY.types())})")
+
+    if args.vectorized:
+        results = run_batch_vectorized(args.enemy, args.level, args.fights, args.policy, seed=args.seed)
+    else:
+        results = run_batch(args.enemy, args.level, args.fights, args.policy, args.workers, seed=args.seed)
+    print(format_report(results, args.level))
@@ -0,0 +1,423 @@
+"""
+game_solver.py
+Exact combat solver - Treats a fight as a Markov chain over dice rolls instead of sampling it
+"""
+
+import argparse
+import struct
+
+from Game_Logic import Player, GameEngine, POTION_HEAL, ELIXIR_BOOST, ELIXIR_TURNS, ELIXIR_SOURCE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+ATTACK_ROLLS = range(6)   # player_attack: randint(0, 5)
+COUNTER_ROLLS = range(4)  # Enemy.attack_player: randint(0, 3)
+BRACED_ROLLS = range(3)   # player_defend: randint(0, 2)
+
+# Action codes in a PolicyTable, named after the GameEngine methods they call.
+# On ties the earliest action wins so items are never spent for nothing.
+ACTIONS = ("player_attack", "player_defend", "use_health_potion", "use_strength_elixir")
+
+
+# ========== POLICIES ==========
+# A policy maps (fight, player_hp, enemy_hp, strength_turns) to "attack" or "defend".
+# Policies are looked up by name so the name can be part of the cache key.
+
+def _always_attack(fight, player_hp, enemy_hp, strength_turns):
+    return "attack"
+
+
+def _defend_when_low(fight, player_hp, enemy_hp, strength_turns):
+    worst_hit = max(1, fight[3] + 3 - fight[1])
+
+    if player_hp <= worst_hit and enemy_hp > 1:
+        return "defend"
+    return "attack"
+
+
+POLICIES = {
+    "attack": _always_attack,
+    "defend_low": _defend_when_low
+}
+
+
+# ========== MARKOV CHAIN ==========
+
+def _fight_key(player, enemy, strength_boost, policy):
+    """Everything about a fight that stays fixed while it is played out
+
+    The elixir is part of the state being solved, so an active one is
+    taken back off player.attack.
+    """
+    return (player.attack - player.modifier_value(ELIXIR_SOURCE), player.defense, strength_boost, enemy.attack, enemy.defense, policy)
+
+
+# Solved states per fight, {fight: {(player_hp, enemy_hp, strength_turns): (win, turns)}}
+_STATES = {}
+_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+def _transitions(fight, player_hp, enemy_hp, strength_turns):
+    """(probability, next state) pairs for one turn; next state is None when the turn wins"""
+    player_attack, player_defense, strength_boost, enemy_attack, enemy_defense, policy = fight
+    next_turns = strength_turns - 1 if strength_turns > 0 else 0
+
+    if POLICIES[policy](fight, player_hp, enemy_hp, strength_turns) == "defend":
+        chance = 1 / len(BRACED_ROLLS)
+        transitions = []
+        for roll in BRACED_ROLLS:
+            hit = max(1, enemy_attack // 2 + roll)
+            taken = max(1, hit - player_defense)
+            transitions.append((chance, (max(0, player_hp - taken), enemy_hp, next_turns)))
+        return transitions
+
+    attack = player_attack + (strength_boost if strength_turns > 0 else 0)
+    chance = 1 / len(ATTACK_ROLLS)
+    transitions = []
+    for roll in ATTACK_ROLLS:
+        dealt = max(1, attack + roll - enemy_defense)
+        hit_enemy_hp = max(0, enemy_hp - dealt)
+
+        if hit_enemy_hp == 0:
+            transitions.append((chance, None))
+            continue
+
+        for counter in COUNTER_ROLLS:
+            taken = max(1, enemy_attack + counter - player_defense)
+            transitions.append((chance / len(COUNTER_ROLLS), (max(0, player_hp - taken), hit_enemy_hp, next_turns)))
+    return transitions
+
+
+def _solve_state(fight, player_hp, enemy_hp, strength_turns):
+    """Return (win probability, expected remaining turns) from one combat state
+
+    Every action lowers either player_hp or enemy_hp by at least 1, so the
+    chain is acyclic. States are solved depth-first from an explicit stack
+    rather than by recursion, so a long fight (lots of HP, little damage)
+    can't run into the recursion limit.
+    """
+    if enemy_hp <= 0:
+        return 1.0, 0.0
+    if player_hp <= 0:
+        return 0.0, 0.0
+
+    states = _STATES.setdefault(fight, {})
+    root = (player_hp, enemy_hp, strength_turns)
+    if root in states:
+        _CACHE_STATS["hits"] += 1
+        return states[root]
+
+    # A won fight (None) and a lost one (no player HP) need no more turns
+    states[None] = (1.0, 0.0)
+    stack = [(root, _transitions(fight, *root))]
+
+    while stack:
+        state, transitions = stack[-1]
+
+        unsolved = set()
+        for _, next_state in transitions:
+            if next_state in states or next_state in unsolved:
+                continue
+            if next_state[0] <= 0:
+                states[next_state] = (0.0, 0.0)
+            else:
+                unsolved.add(next_state)
+                stack.append((next_state, _transitions(fight, *next_state)))
+        if unsolved:
+            continue
+
+        stack.pop()
+        if state in states:
+            # Pushed more than once before it was solved
+            continue
+
+        win = 0.0
+        turns = 0.0
+        for chance, next_state in transitions:
+            w, t = states[next_state]
+            win += chance * w
+            turns += chance * t
+
+        states[state] = (win, 1 + turns)
+        _CACHE_STATS["misses"] += 1
+
+    return states[root]
+
+
+def solve_fight(player, enemy, policy="attack", strength_boost=0, strength_turns=0):
+    """Exact win probability and expected turns for a fight under a fixed policy
+
+    Results are memoized per state across calls, so repeat queries for the
+    same enemy at the same player stats are free.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy}")
+
+    fight = _fight_key(player, enemy, strength_boost, policy)
+    win, turns = _solve_state(fight, player.hp, enemy.hp, strength_turns)
+
+    return {
+        "win_probability": win,
+        "expected_turns": turns
+    }
+
+
+def cache_info():
+    """Hit/miss statistics for the shared state cache
+
+    A hit is a solve_fight answered from the cache; a miss is one state solved.
+    """
+    return dict(_CACHE_STATS)
+
+
+def clear_cache():
+    """Drop every memoized state"""
+    _STATES.clear()
+    _CACHE_STATS["hits"] = 0
+    _CACHE_STATS["misses"] = 0
+
+
+# ========== OPTIMAL POLICY TABLES ==========
+
+class PolicyTable:
+    """Best action for every state of one fight, packed 2 bits per state
+
+    States are (player_hp, enemy_hp, strength_turns, potions, elixirs).
+    Lookups are O(1) and need neither numpy nor a solve.
+    """
+
+    def __init__(self, name, dims, data, win_probability):
+        self.name = name
+        self.dims = dims  # (potions, elixirs, player max hp, enemy max hp, strength turns)
+        self.data = data
+        self.win_probability = win_probability
+    
+    def action(self, player_hp, enemy_hp, strength_turns=0, potions=0, elixirs=0):
+        """Name of the GameEngine method to call in this state
+
+        Values outside the solved range are clamped to it, e.g. HP above the
+        max_hp the table was solved for is looked up as max_hp.
+        """
+        max_potions, max_elixirs, max_hp, enemy_max_hp, turn_states = self.dims
+
+        potions = min(potions, max_potions)
+        elixirs = min(elixirs, max_elixirs)
+        player_hp = min(max(player_hp, 0), max_hp)
+        enemy_hp = min(max(enemy_hp, 0), enemy_max_hp)
+        strength_turns = min(max(strength_turns, 0), turn_states - 1)
+
+        index = (((potions * (max_elixirs + 1) + elixirs) * (max_hp + 1) + player_hp)
+                 * (enemy_max_hp + 1) + enemy_hp) * turn_states + strength_turns
+        code = (self.data[index >> 2] >> ((index & 3) * 2)) & 3
+
+        return ACTIONS[code]
+    
+    def action_for(self, engine):
+        """Best action for the fight currently running in a GameEngine"""
+        inventory = engine.player.inventory
+
+        return self.action(
+            engine.player.hp,
+            engine.current_enemy.hp,
+            engine.strength_turns,
+            inventory.count("Health Potion"),
+            inventory.count("Strength Elixir")
+        )
+
+
+def solve_policy(player, enemy, potions=0, elixirs=0, continuation=None):
+    """Backward-induct the optimal policy for one fight
+
+    Every action either lowers an HP value or spends an item, so sweeping
+    layers in order of (potions, elixirs, player_hp) is value iteration that
+    converges in a single pass. `continuation[p, e, hp]` is the value of
+    winning with that inventory and HP left (1.0 when omitted).
+
+    Returns (PolicyTable, values) where values[(p, e)] has shape
+    (player max hp + 1, enemy max hp + 1, strength turns + 1).
+    """
+    if np is None:
+        raise ImportError("solve_policy needs numpy (pip install numpy)")
+
+    max_hp = player.max_hp
+    enemy_max_hp = enemy.hp
+    turn_states = ELIXIR_TURNS + 1
+
+    if continuation is None:
+        continuation = np.ones((potions + 1, elixirs + 1, max_hp + 1))
+
+    enemy_hp = np.arange(enemy_max_hp + 1)[:, None]
+    shape = (enemy_max_hp + 1, turn_states)
+    strength = np.broadcast_to(np.arange(turn_states), shape)
+    ticked = np.maximum(strength - 1, 0)
+    boosted = np.full(shape, ELIXIR_TURNS)
+
+    attack = player.attack - player.modifier_value(ELIXIR_SOURCE) + np.where(np.arange(turn_states) > 0, ELIXIR_BOOST, 0)
+    counters = [max(1, enemy.attack + roll - player.defense) for roll in COUNTER_ROLLS]
+    braced = [max(1, max(1, enemy.attack // 2 + roll) - player.defense) for roll in BRACED_ROLLS]
+
+    actions = np.zeros((potions + 1, elixirs + 1, max_hp + 1) + shape, dtype=np.uint8)
+    values = {}
+
+    for p in range(potions + 1):
+        for e in range(elixirs + 1):
+            value = np.zeros((max_hp + 1,) + shape)
+
+            for hp in range(1, max_hp + 1):
+                q = np.full((len(ACTIONS),) + shape, -1.0)
+
+                q[0] = 0.0
+                for roll in ATTACK_ROLLS:
+                    left = np.maximum(0, enemy_hp - np.maximum(1, attack + roll - enemy.defense))
+                    survive = sum(value[max(0, hp - taken)][left, ticked] for taken in counters)
+
+                    q[0] += np.where(left == 0, continuation[p, e, hp], survive / len(counters))
+                q[0] /= len(ATTACK_ROLLS)
+
+                q[1] = sum(value[max(0, hp - taken)][:, ticked[0]] for taken in braced) / len(braced)
+
+                if p > 0:
+                    healed = min(hp + POTION_HEAL, max_hp)
+                    q[2] = sum(values[(p - 1, e)][max(0, healed - taken)] for taken in counters) / len(counters)
+
+                if e > 0:
+                    after = values[(p, e - 1)]
+                    q[3] = sum(after[max(0, hp - taken)][:, boosted[0]] for taken in counters) / len(counters)
+
+                best = q.max(axis=0)
+                actions[p, e, hp] = np.argmax(q >= best - 1e-12, axis=0)
+
+                value[hp] = best
+                value[hp, 0] = continuation[p, e, hp]
+
+            values[(p, e)] = value
+
+    flat = np.concatenate([actions.ravel(), np.zeros(-actions.size % 4, dtype=np.uint8)])
+    packed = flat[0::4] | (flat[1::4] << 2) | (flat[2::4] << 4) | (flat[3::4] << 6)
+
+    win_probability = float(values[(potions, elixirs)][player.hp, enemy_max_hp, 0])
+    dims = (potions, elixirs, max_hp, enemy_max_hp, turn_states)
+
+    return PolicyTable(enemy.name, dims, packed.tobytes(), win_probability), values
+
+
+def solve_quest(quest, level=1, potions=2, elixirs=2):
+    """Optimal policy tables for a whole setup_*_quest chain
+
+    HP and items carry over between fights, and level ups from the EXP
+    rewards (with their full heal) are applied, so the returned win
+    probability is that of a perfect player clearing the whole chain.
+    """
+    engine = GameEngine(quiet=True)
+    getattr(engine, f"setup_{quest}_quest")()
+    chain = list(engine.quest_chain)
+
+    # Work out the player's stats going into each fight
+    player = Player.at_level(level)
+    stages = []
+    for enemy in chain:
+        stats = Player()
+        stats.hp = stats.max_hp = player.max_hp
+        stats.attack = player.attack
+        stats.defense = player.defense
+
+        level_before = player.level
+        player.gain_exp(enemy.exp_reward)
+        stages.append((stats, enemy, player.level > level_before))
+
+    # Solve from the last fight backwards, chaining each start value into the previous win value
+    tables = []
+    continuation = None
+    for stats, enemy, levels_up in reversed(stages):
+        if continuation is not None and levels_up:
+            continuation = np.repeat(continuation[:, :, -1:], stats.max_hp + 1, axis=2)
+        elif continuation is not None:
+            continuation = continuation[:, :, :stats.max_hp + 1]
+
+        table, values = solve_policy(stats, enemy, potions, elixirs, continuation)
+        tables.append(table)
+
+        continuation = np.zeros((potions + 1, elixirs + 1, stats.max_hp + 1))
+        for (p, e), value in values.items():
+            continuation[p, e] = value[:, enemy.hp, 0]
+
+    tables.reverse()
+    return tables[0].win_probability, tables
+
+
+# ========== SAVE / LOAD ==========
+
+POLICY_MAGIC = b"RPGPOL"
+POLICY_VERSION = 1
+
+
+def save_policy_tables(path, tables):
+    """Write PolicyTables to one binary file"""
+    with open(path, "wb") as f:
+        f.write(POLICY_MAGIC)
+        f.write(struct.pack("<HI", POLICY_VERSION, len(tables)))
+
+        for table in tables:
+            name = table.name.encode("utf-8")
+
+            f.write(struct.pack("<H", len(name)))
+            f.write(name)
+            f.write(struct.pack("<5IdI", *table.dims, table.win_probability, len(table.data)))
+            f.write(table.data)
+
+
+def load_policy_tables(path):
+    """Read PolicyTables written by save_policy_tables, in file order"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if data[:len(POLICY_MAGIC)] != POLICY_MAGIC:
+        raise ValueError(f"{path} is not a policy table file")
+
+    offset = len(POLICY_MAGIC)
+    version, count = struct.unpack_from("<HI", data, offset)
+    if version != POLICY_VERSION:
+        raise ValueError(f"Unsupported policy table version: {version}")
+    offset += struct.calcsize("<HI")
+
+    view = memoryview(data)
+    tables = []
+    for _ in range(count):
+        (name_len,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        name = data[offset:offset + name_len].decode("utf-8")
+        offset += name_len
+
+        *dims, win_probability, size = struct.unpack_from("<5IdI", data, offset)
+        offset += struct.calcsize("<5IdI")
+
+        tables.append(PolicyTable(name, tuple(dims), view[offset:offset + size], win_probability))
+        offset += size
+
+    return tables
+
+
+# ========== RUN SOLVER ==========
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfect-play win rates for each quest chain")
+
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--potions", type=int, default=2)
+    parser.add_argument("--elixirs", type=int, default=2)
+    parser.add_argument("--save", help="write every policy table to this file")
+    args = parser.parse_args()
+
+    all_tables = []
+    for quest in ("bandit", "troll", "castle", "dragon"):
+        win, tables = solve_quest(quest, args.level, args.potions, args.elixirs)
+        all_tables.extend(tables)
+
+        print(f"{quest:<8}{win * 100:>8.2f}%  " + " -> ".join(t.name for t in tables))
+
+    if args.save:
+        save_policy_tables(args.save, all_tables)
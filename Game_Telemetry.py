@@ -0,0 +1,454 @@
+"""
+game_telemetry.py
+Telemetry - Buffers gameplay events from a GameEngine and writes them as compressed columnar blocks
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+from Game_Logic import JOURNALED_ACTIONS, POTION_HEAL
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+TELEMETRY_MAGIC = b"RPGTEL"
+TELEMETRY_VERSION = 1
+FILE_HEADER = struct.Struct("<6sH")
+BLOCK_HEADER = struct.Struct("<IH")  # rows, strings in the block's dictionary
+
+# Column name -> array typecode. enemy and item are indexes into the block's string dictionary (0 = none)
+COLUMNS = (
+    ("session", "I"),
+    ("fight", "I"),
+    ("time", "f"),
+    ("kind", "B"),
+    ("level", "H"),
+    ("hp", "i"),
+    ("enemy", "H"),
+    ("item", "H"),
+    ("amount", "i")
+)
+
+KINDS = (
+    "fight_start",    # enemy; hp going in
+    "fight_won",      # enemy; amount = turns
+    "fight_lost",     # enemy; amount = turns
+    "damage_dealt",   # enemy; amount = damage
+    "damage_taken",   # enemy; amount = damage
+    "level_up",       # level = new level
+    "purchase",       # item; amount = gold spent
+    "boss_defeated"   # enemy
+)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+BATCH_ROWS = 4096
+FLUSH_SECONDS = 5.0
+
+TURN_ACTIONS = {JOURNALED_ACTIONS.index(name) for name in
+                ("player_attack", "player_defend", "use_health_potion", "use_strength_elixir")}
+START_COMBAT = JOURNALED_ACTIONS.index("start_combat")
+POTION = JOURNALED_ACTIONS.index("use_health_potion")
+PURCHASES = {JOURNALED_ACTIONS.index(name) for name in ("buy_item", "buy_armor")}
+
+
+# ========== WRITING ==========
+
+def encode_block(columns, strings):
+    """One self-contained block: header, string dictionary, then each column zlib-compressed"""
+    out = bytearray(BLOCK_HEADER.pack(len(columns["session"]), len(strings)))
+
+    for text in strings:
+        data = text.encode("utf-8")
+        out += struct.pack("<H", len(data))
+        out += data
+
+    for name, _ in COLUMNS:
+        column = columns[name]
+        if sys.byteorder == "big":
+            column = array(column.typecode, column)
+            column.byteswap()
+
+        data = zlib.compress(column.tobytes(), 1)
+        out += struct.pack("<I", len(data))
+        out += data
+
+    return bytes(out)
+
+
+class TelemetrySink:
+    """Turns engine actions into telemetry rows and writes them in batches off the main thread
+
+    Attach it to an engine and every journaled action is compared before
+    and after to produce rows (fights, damage, level ups, purchases, boss
+    defeats). Rows are appended to in-memory columns; every BATCH_ROWS
+    rows or FLUSH_SECONDS the columns are handed to a worker thread that
+    compresses them and appends one block to the file, so the game loop
+    never waits on disk.
+    """
+
+    def __init__(self, path, session=None, batch_rows=BATCH_ROWS, flush_seconds=FLUSH_SECONDS):
+        self.path = path
+        self.session = random.getrandbits(32) if session is None else session
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+
+        self.started = time.monotonic()
+        self.last_flush = self.started
+        self.fight = 0
+        self.turns = 0
+        self._new_batch()
+
+        self.pending = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+
+        self.running = True
+        self.blocks_written = 0
+        self.rows_written = 0
+        self.last_error = None
+
+        self.thread = threading.Thread(target=self._worker, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def _new_batch(self):
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS}
+        self.strings = {}
+
+    def attach(self, engine):
+        """Start receiving an engine's actions"""
+        engine.telemetry = self
+
+    def detach(self, engine):
+        """Stop receiving an engine's actions"""
+        engine.telemetry = None
+
+    # ========== ROWS ==========
+
+    def _code(self, text):
+        """Dictionary code of a string in the current batch"""
+        if text is None:
+            return 0
+
+        code = self.strings.get(text)
+        if code is None:
+            code = self.strings[text] = len(self.strings) + 1
+        return code
+
+    def row(self, kind, level, hp, enemy=None, item=None, amount=0):
+        """Append one row"""
+        columns = self.columns
+        columns["session"].append(self.session)
+        columns["fight"].append(self.fight)
+        columns["time"].append(time.monotonic() - self.started)
+        columns["kind"].append(KIND_CODES[kind])
+        columns["level"].append(level)
+        columns["hp"].append(hp)
+        columns["enemy"].append(self._code(enemy))
+        columns["item"].append(self._code(item))
+        columns["amount"].append(amount)
+
+    def before(self, engine):
+        """Called by @journaled before an action - the state the action is measured against"""
+        player = engine.player
+        enemy = engine.current_enemy
+
+        return (player.hp, player.max_hp, player.level, player.gold, len(player.defeated_bosses),
+                player.inventory.count("Health Potion"), enemy.hp if enemy else 0, engine.is_combat_over())
+
+    def after(self, engine, code, args, before):
+        """Called by @journaled after an action - record what it changed"""
+        hp, max_hp, level, gold, bosses, potions, enemy_hp, was_over = before
+        player = engine.player
+        enemy = engine.current_enemy
+
+        if code == START_COMBAT:
+            self.fight += 1
+            self.turns = 0
+            self.row("fight_start", player.level, player.hp, enemy.name)
+
+        elif code in TURN_ACTIONS and enemy is not None and not was_over:
+            self.turns += 1
+
+            dealt = enemy_hp - enemy.hp
+            if dealt > 0:
+                self.row("damage_dealt", level, player.hp, enemy.name, amount=dealt)
+
+            # A level up heals, but it only happens once the enemy is dead and can't hit back
+            if player.level == level:
+                if code == POTION and player.inventory.count("Health Potion") < potions:
+                    hp = min(hp + POTION_HEAL, max_hp)
+                if hp > player.hp:
+                    self.row("damage_taken", level, player.hp, enemy.name, amount=hp - player.hp)
+
+            if engine.is_combat_over():
+                kind = "fight_won" if engine.player_is_alive() else "fight_lost"
+                self.row(kind, player.level, player.hp, enemy.name, amount=self.turns)
+
+        elif code in PURCHASES and player.gold < gold:
+            self.row("purchase", player.level, player.hp, item=args[0], amount=gold - player.gold)
+
+        for new_level in range(level + 1, player.level + 1):
+            self.row("level_up", new_level, player.hp)
+
+        for boss in player.defeated_bosses[bosses:]:
+            self.row("boss_defeated", player.level, player.hp, boss)
+
+        if len(self.columns["session"]) >= self.batch_rows or time.monotonic() - self.last_flush > self.flush_seconds:
+            self.flush()
+
+    # ========== BATCHES ==========
+
+    def flush(self):
+        """Hand the buffered rows to the writer thread"""
+        self.last_flush = time.monotonic()
+        if not self.columns["session"]:
+            return
+
+        batch = (self.columns, list(self.strings))
+        self._new_batch()
+
+        with self.lock:
+            self.pending.append(batch)
+        self.wake.set()
+
+    def _worker(self):
+        while True:
+            self.wake.wait()
+
+            with self.lock:
+                self.wake.clear()
+                batches = self.pending
+                self.pending = []
+                running = self.running
+
+            if batches:
+                try:
+                    self._write(batches)
+                except OSError as error:
+                    self.last_error = error
+
+            if not running:
+                return
+
+    def _write(self, batches):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "ab") as f:
+            if new_file:
+                f.write(FILE_HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION))
+
+            for columns, strings in batches:
+                f.write(encode_block(columns, strings))
+                self.blocks_written += 1
+                self.rows_written += len(columns["session"])
+
+    def close(self):
+        """Write out everything buffered and stop the worker"""
+        self.flush()
+
+        with self.lock:
+            self.running = False
+        self.wake.set()
+
+        self.thread.join()
+
+
+# ========== READING ==========
+
+class TelemetryError(Exception):
+    """A telemetry file is not one, or is from an unknown version"""
+
+
+def read_blocks(path):
+    """Yield (columns, strings) for each block of a file; a block cut short by a crash is skipped"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if len(data) < FILE_HEADER.size:
+        raise TelemetryError(f"{path} is too short to be a telemetry file")
+
+    magic, version = FILE_HEADER.unpack_from(data)
+    if magic != TELEMETRY_MAGIC:
+        raise TelemetryError(f"{path} is not a telemetry file")
+    if version != TELEMETRY_VERSION:
+        raise TelemetryError(f"{path} has unsupported telemetry version {version}")
+
+    offset = FILE_HEADER.size
+    while offset < len(data):
+        try:
+            rows, count = BLOCK_HEADER.unpack_from(data, offset)
+            offset += BLOCK_HEADER.size
+
+            strings = [None]
+            for _ in range(count):
+                (size,) = struct.unpack_from("<H", data, offset)
+                strings.append(data[offset + 2:offset + 2 + size].decode("utf-8"))
+                offset += 2 + size
+
+            columns = {}
+            for name, typecode in COLUMNS:
+                (size,) = struct.unpack_from("<I", data, offset)
+                raw = zlib.decompress(data[offset + 4:offset + 4 + size])
+                offset += 4 + size
+
+                column = array(typecode)
+                column.frombytes(raw)
+                if sys.byteorder == "big":
+                    column.byteswap()
+                columns[name] = column
+        except (struct.error, zlib.error, UnicodeDecodeError):
+            return
+
+        if all(len(column) == rows for column in columns.values()):
+            yield columns, strings
+
+
+class TelemetryTable:
+    """Rows from any number of telemetry files, one array per column
+
+    Block dictionaries are merged into one string table so the enemy and
+    item columns compare across blocks and files. Columns are NumPy
+    arrays when NumPy is installed and plain arrays otherwise.
+    """
+
+    def __init__(self, paths):
+        codes = {None: 0}
+        parts = {name: [] for name, _ in COLUMNS}
+
+        for path in paths:
+            for columns, strings in read_blocks(path):
+                # Block code -> table code
+                remap = [codes.setdefault(text, len(codes)) for text in strings]
+                if np is not None:
+                    remap = np.asarray(remap, dtype=np.uint16)
+
+                for name, _ in COLUMNS:
+                    column = columns[name]
+                    if name in ("enemy", "item"):
+                        column = remap[np.frombuffer(column, np.uint16)] if np is not None else [remap[value] for value in column]
+                    parts[name].append(column)
+
+        self.strings = list(codes)
+
+        self.columns = {}
+        for name, typecode in COLUMNS:
+            if np is not None:
+                arrays = [np.asarray(part, dtype=np.dtype(typecode)) for part in parts[name]]
+                self.columns[name] = np.concatenate(arrays) if arrays else np.zeros(0, np.dtype(typecode))
+            else:
+                merged = array(typecode)
+                for part in parts[name]:
+                    merged.extend(part)
+                self.columns[name] = merged
+
+    def __len__(self):
+        return len(self.columns["session"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def code(self, text):
+        """Dictionary code of a string (-1 if it never occurs)"""
+        return self.strings.index(text) if text in self.strings else -1
+
+
+def load(paths):
+    """Read telemetry files - a path or a list of paths, where a directory means every .tel file in it"""
+    if isinstance(paths, str):
+        paths = [paths]
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".tel")))
+        else:
+            files.append(path)
+    return TelemetryTable(files)
+
+
+def difficulty_by_enemy(table):
+    """Per enemy: fights, win rate, mean turns, mean damage taken per fight and mean player level
+
+    The spikes show up as enemies with a low win rate or a high damage
+    taken for the level players meet them at.
+    """
+    kind = table["kind"]
+    enemy = table["enemy"]
+    size = len(table.strings)
+
+    def per_enemy(kind_name, weights=None):
+        mask_kind = KIND_CODES[kind_name]
+        if np is not None:
+            mask = kind == mask_kind
+            return np.bincount(enemy[mask], weights=None if weights is None else weights[mask], minlength=size)
+
+        totals = [0] * size
+        for i, row_kind in enumerate(kind):
+            if row_kind == mask_kind:
+                totals[enemy[i]] += 1 if weights is None else weights[i]
+        return totals
+
+    amount = table["amount"]
+    level = table["level"]
+
+    fights = per_enemy("fight_start")
+    levels = per_enemy("fight_start", level)
+    wins = per_enemy("fight_won")
+    win_turns = per_enemy("fight_won", amount)
+    losses = per_enemy("fight_lost")
+    loss_turns = per_enemy("fight_lost", amount)
+    taken = per_enemy("damage_taken", amount)
+
+    results = {}
+    for code in range(1, size):
+        if not fights[code]:
+            continue
+
+        finished = wins[code] + losses[code]
+        results[table.strings[code]] = {
+            "fights": int(fights[code]),
+            "win_rate": wins[code] / finished if finished else 0.0,
+            "mean_turns": (win_turns[code] + loss_turns[code]) / finished if finished else 0.0,
+            "damage_taken": taken[code] / fights[code],
+            "mean_level": levels[code] / fights[code]
+        }
+    return results
+
+
+def format_report(results):
+    """Format difficulty_by_enemy() as a text table, hardest first"""
+    lines = [f"{'Enemy':<18}{'Fights':>9}{'Win %':>8}{'Turns':>7}{'Dmg taken':>11}{'Level':>7}"]
+
+    for name, r in sorted(results.items(), key=lambda item: item[1]["win_rate"]):
+        lines.append(
+            f"{name:<18}{r['fights']:>9}{r['win_rate'] * 100:>7.1f}%{r['mean_turns']:>7.1f}"
+            f"{r['damage_taken']:>11.1f}{r['mean_level']:>7.1f}"
+        )
+    return "\n".join(lines)
+
+
+# ========== RUN REPORT ==========
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Difficulty report from recorded telemetry")
+    parser.add_argument("paths", nargs="+", help="telemetry files or directories of .tel files")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = load(args.paths)
+
+    print(format_report(difficulty_by_enemy(table)))
+    print(f"{len(table)} rows in {time.perf_counter() - start:.2f}s")
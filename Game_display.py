@@ -1,11 +1,17 @@
 
+import heapq
+import itertools
+import os
 import pygame
 import sys
-from Game_Logic import Player, Enemy, GameEngine
+import time
+from collections import OrderedDict, deque
+from Game_Logic import Player, Enemy, GameEngine, EQUIPMENT
+from Game_Profiler import FrameProfiler
+from Game_Save import AutoSaver, SaveError, load_game, read_header
+from Game_Telemetry import TelemetrySink
 
 
-pygame.init()
-
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -25,12 +31,297 @@ CYAN = (23, 162, 184)
 DARK_RED = (139, 0, 0)
 DARK_GREEN = (0, 100, 0)
 
+# Window
+SCREEN_SIZE = (1100, 750)
+
+# Font sizes (fonts are loaded on first use through get_font)
+TITLE_FONT_SIZE = 56
+HEADER_FONT_SIZE = 32
+NORMAL_FONT_SIZE = 24
+SMALL_FONT_SIZE = 20
+
+# Frame pacing
+ACTIVE_FPS = 60
+IDLE_WAIT_MS = 1000     # longest the loop sleeps in event.wait while idle
+ACTIVE_LINGER_MS = 250  # stay at full rate this long after the last input or redraw
+
+# Saves
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves")
+AUTOSAVE_PATH = os.path.join(SAVE_DIR, "autosave.sav")
+
+# Telemetry: one file of gameplay events per session
+TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry")
+
+# Profiling overlay: F3 toggles it, F4 captures a cProfile dump into PROFILE_DIR
+PROFILER_KEY = pygame.K_F3
+CAPTURE_KEY = pygame.K_F4
+PROFILER_RECT = pygame.Rect(790, 480, 300, 260)
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+
+
+# ========== STARTUP ==========
+
+def init_pygame(headless=False):
+    """Bring up only what the game uses: display, font and the timer
+    
+    Importing this module initializes nothing. Audio and joysticks are
+    never started here; code that needs them should init pygame.mixer or
+    pygame.joystick at its first use.
+    """
+    if not pygame.display.get_init():
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+    
+    if not pygame.font.get_init():
+        pygame.font.init()
+    
+    # get_ticks() reads SDL's timer, which pygame.init() used to start; a clock tick starts it alone
+    pygame.time.Clock().tick()
+
+
+FONTS = {}
+
+
+def get_font(size, name=None):
+    """Shared font of a given size, loaded the first time it is asked for"""
+    font = FONTS.get((name, size))
+    
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = FONTS[(name, size)] = pygame.font.Font(name, size)
+    return font
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces shared by every draw path
+    
+    Keyed on (font, text, antialias, color). Cached surfaces are shared,
+    so callers must only blit them, never draw onto them.
+    """
+    
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def render(self, font, text, antialias, color):
+        """Return a cached surface for this text, rendering it on a miss"""
+        key = (font, text, antialias, color)
+        surface = self.surfaces.get(key)
+        
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+    
+    def stats(self):
+        """Hit/miss/eviction counters"""
+        return {
+            "size": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+    
+    def clear(self):
+        """Drop every cached surface"""
+        self.surfaces.clear()
+
+
+TEXT_CACHE = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """font.render through the shared TEXT_CACHE"""
+    return TEXT_CACHE.render(font, text, antialias, color)
+
+
+class TextLayout:
+    """Word-wrapping service with per-word width and per-layout caches
+    
+    Each word is measured once per font and line widths are accumulated,
+    so wrapping is a single linear pass; only lines that end up within a
+    few pixels of the edge are measured whole. Whole layouts are cached per
+    (text, font, width), so redrawing the same message costs a dict lookup.
+    Explicit newlines start a new line; blank lines are kept.
+    """
+    
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.layouts = OrderedDict()
+        self.word_widths = {}
+    
+    def measure(self, font, word):
+        """Width of a word in a font, measured once"""
+        key = (font, word)
+        width = self.word_widths.get(key)
+        
+        if width is None:
+            width = self.word_widths[key] = font.size(word)[0]
+        return width
+    
+    def wrap(self, text, font, max_width):
+        """Lines of text that fit max_width, as a tuple"""
+        key = (text, font, max_width)
+        lines = self.layouts.get(key)
+        
+        if lines is not None:
+            self.layouts.move_to_end(key)
+            return lines
+        
+        lines = tuple(self.layout(text, font, max_width))
+        self.layouts[key] = lines
+        
+        if len(self.layouts) > self.capacity:
+            self.layouts.popitem(last=False)
+        return lines
+    
+    def layout(self, text, font, max_width):
+        """Uncached single-pass wrap"""
+        space = self.measure(font, " ")
+        lines = []
+        
+        for paragraph in text.split("\n"):
+            current_line = []
+            line_width = 0
+            
+            for word in paragraph.split(" "):
+                word_width = self.measure(font, word)
+                
+                # Summed widths drift a pixel or so per word either way from the
+                # real line width (kerning), so only a sum clearly past the edge
+                # breaks unmeasured; lines that land near it get measured
+                next_width = line_width + space + word_width
+                if current_line and next_width > max_width - len(current_line):
+                    fits = next_width <= max_width + len(current_line) and font.size(" ".join(current_line + [word]))[0] <= max_width
+                else:
+                    fits = True
+                
+                if not fits:
+                    lines.append(" ".join(current_line))
+                    current_line = [word]
+                    line_width = word_width
+                elif current_line:
+                    current_line.append(word)
+                    line_width = next_width
+                else:
+                    current_line = [word]
+                    line_width = word_width
+            
+            lines.append(" ".join(current_line))
+        
+        return lines
+
+
+TEXT_LAYOUT = TextLayout()
+
+
+class Timeline:
+    """Frame-driven scheduler for delayed callbacks (replaces pygame.time.wait)
+    
+    The main loop calls update() once per frame; due callbacks run there,
+    so rendering and input keep going while a transition is pending.
+    """
+    
+    def __init__(self):
+        self.entries = []
+        self.counter = itertools.count()
+        self.cancelled = set()
+    
+    def schedule(self, delay_ms, callback, now=None):
+        """Run callback once delay_ms have passed; returns an id for cancel()"""
+        now = pygame.time.get_ticks() if now is None else now
+        entry_id = next(self.counter)
+        
+        heapq.heappush(self.entries, (now + delay_ms, entry_id, callback))
+        return entry_id
+    
+    def cancel(self, entry_id):
+        """Stop a scheduled callback from running"""
+        self.cancelled.add(entry_id)
+    
+    def clear(self):
+        """Drop every scheduled callback"""
+        self.entries = []
+        self.cancelled.clear()
+    
+    def pending(self):
+        """Whether any callback is still waiting"""
+        return any(entry[1] not in self.cancelled for entry in self.entries)
+    
+    def update(self, now=None):
+        """Run every callback that is due"""
+        now = pygame.time.get_ticks() if now is None else now
+        
+        while self.entries and self.entries[0][0] <= now:
+            _, entry_id, callback = heapq.heappop(self.entries)
+            
+            if entry_id in self.cancelled:
+                self.cancelled.discard(entry_id)
+                continue
+            callback()
+
+
+class FramePacer:
+    """Rolling frame-pacing statistics for the main loop"""
+    
+    def __init__(self, window=600):
+        self.frames = deque(maxlen=window)
+        self.total_frames = 0
+        self.idle_frames = 0
+    
+    def record(self, frame_ms, idle, drew):
+        """Record one loop iteration"""
+        self.frames.append((frame_ms, idle, drew))
+        self.total_frames += 1
+        
+        if idle:
+            self.idle_frames += 1
+    
+    def stats(self):
+        """Summary over the recent window"""
+        if not self.frames:
+            return {"frames": 0}
+        
+        times = sorted(frame[0] for frame in self.frames)
+        elapsed = sum(times)
+        
+        return {
+            "frames": self.total_frames,
+            "idle_frames": self.idle_frames,
+            "recent_idle": sum(1 for frame in self.frames if frame[1]),
+            "recent_drawn": sum(1 for frame in self.frames if frame[2]),
+            "avg_frame_ms": elapsed / len(times),
+            "p95_frame_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "loops_per_sec": len(times) * 1000 / elapsed if elapsed else 0.0
+        }
 
 
 class StatBar:
-    """Visual stat bar (HP, EXP, etc)"""
+    """Visual stat bar (HP, EXP, etc)
     
-    def __init__(self, x, y, width, height, max_value, current_value, color=GREEN):
+    Background and border are drawn once into a cached surface and the
+    numeric label is re-rendered only when the values change. The fill
+    tweens from its previous level to the new one over tween_ms, so a
+    frame costs one blit, one rect fill and one label blit either way.
+    """
+    
+    def __init__(self, x, y, width, height, max_value, current_value, color=GREEN, tween_ms=300):
         self.x = x
         self.y = y
         
@@ -42,40 +333,106 @@ class StatBar:
         
         self.current_value = current_value
         self.color = color
+        
+        self.rect = pygame.Rect(x, y, width, height)
+        
+        # Fill level as a fraction of the bar, tweened from tween_from at tween_start
+        self.tween_ms = tween_ms
+        self.fraction = self.target_fraction()
+        self.tween_from = self.fraction
+        self.tween_start = None
+        self.fill_width = int(self.fraction * width)
+        
+        self.chrome = None
+        self.label = None
+        self.label_key = None
+    
+    def target_fraction(self):
+        """Fill level the bar is heading for"""
+        if self.max_value > 0:
+            return max(0.0, min(1.0, self.current_value / self.max_value))
+        return 0.0
     
-    def update(self, current_value, max_value=None):
-        """(bar values)"""
+    def update(self, current_value, max_value=None, animate=True, now=None):
+        """(bar values) - a change starts a tween unless animate is False"""
+        if current_value == self.current_value and (not max_value or max_value == self.max_value):
+            return
+        
         self.current_value = current_value
         if max_value:
             self.max_value = max_value
+        
+        if animate and self.tween_ms > 0:
+            self.advance(now)
+            self.tween_from = self.fraction
+            self.tween_start = pygame.time.get_ticks() if now is None else now
+        else:
+            self.tween_start = None
+            self.fraction = self.target_fraction()
+            self.fill_width = int(self.fraction * self.width)
+    
+    def advance(self, now=None):
+        """Move the tween to `now`; call once per frame before dirty_key()"""
+        if self.tween_start is None:
+            return
+        
+        now = pygame.time.get_ticks() if now is None else now
+        t = (now - self.tween_start) / self.tween_ms
+        target = self.target_fraction()
+        
+        if t >= 1:
+            self.fraction = target
+            self.tween_start = None
+        else:
+            # Ease out: fast at first, settling onto the new value
+            t = 1 - (1 - t) * (1 - t)
+            self.fraction = self.tween_from + (target - self.tween_from) * t
+        
+        self.fill_width = int(self.fraction * self.width)
+    
+    def animating(self):
+        """Whether the fill is still moving"""
+        return self.tween_start is not None
+    
+    def dirty_key(self):
+        """Everything the bar shows - it needs redrawing when this changes"""
+        return (self.fill_width, int(self.current_value), int(self.max_value))
+    
+    def render_chrome(self):
+        """Pre-render the background and border"""
+        surface = pygame.Surface(self.rect.size)
+        surface.fill(DARK_GRAY)
+        
+        pygame.draw.rect(surface, WHITE, surface.get_rect(), 2)
+        return surface
     
     def draw(self, screen, font):
         """Draw stat bar"""
-        # Background
-        pygame.draw.rect(screen, DARK_GRAY, (self.x, self.y, self.width, self.height))
-        
-        # Fill bar
-        if self.max_value > 0:
-            fill_width = int((self.current_value / self.max_value) * self.width)
+        if self.chrome is None:
+            self.chrome = self.render_chrome()
+        screen.blit(self.chrome, self.rect)
+        
+        # Fill (inside the 2px border)
+        if self.fill_width > 2:
+            inner = self.rect.inflate(-4, -4)
+            inner.width = min(inner.width, self.fill_width - 2)
             
-            pygame.draw.rect(screen, self.color, (self.x, self.y, fill_width, self.height))
-        
-        # Border
-        pygame.draw.rect(screen, WHITE, (self.x, self.y, self.width, self.height), 2)
+            screen.fill(self.color, inner)
         
         # Text
-        text = f"{int(self.current_value)}/{int(self.max_value)}"
-        
-        text_surface = font.render(text, True, WHITE)
-        text_rect = text_surface.get_rect(center=(self.x + self.width // 2, self.y + self.height // 2))
+        label_key = (font, int(self.current_value), int(self.max_value))
+        if label_key != self.label_key:
+            text = f"{int(self.current_value)}/{int(self.max_value)}"
+            self.label = render_text(font, text, WHITE)
+            self.label_key = label_key
         
-        screen.blit(text_surface, text_rect)
+        screen.blit(self.label, self.label.get_rect(center=self.rect.center))
 
 
 class Button:
     """Interactive button"""
     
-    def __init__(self, x, y, width, height, text, color=BLUE, text_color=WHITE, font=None):
+    def __init__(self, x, y, width, height, text, color=BLUE, text_color=WHITE, font=None, font_size=NORMAL_FONT_SIZE):
         self.rect = pygame.Rect(x, y, width, height)
         
         self.text = text
@@ -83,21 +440,52 @@ class Button:
         
         
         self.text_color = text_color
-        self.font = font or pygame.font.Font(None, 24)
+        self.custom_font = font
+        self.font_size = font_size
         self.hovered = False
+        
+        # Pre-rendered faces keyed by hovered state
+        self.faces = {}
     
-    def draw(self, screen):
-        """Draw button"""
-        color = tuple(min(c + 30, 255) for c in self.color) if self.hovered else self.color
-        pygame.draw.rect(screen, color, self.rect, border_radius=8)
+    @property
+    def font(self):
+        """Label font - the one given, or the shared font of font_size (loaded when first drawn)"""
+        return self.custom_font or get_font(self.font_size)
+    
+    def set_text(self, text):
+        """Change the label, dropping the pre-rendered faces if it differs"""
+        if text != self.text:
+            self.text = text
+            self.faces = {}
+    
+    def render_face(self, hovered):
+        """Pre-render the button in its normal or hovered state"""
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        local_rect = surface.get_rect()
+        
+        color = tuple(min(c + 30, 255) for c in self.color) if hovered else self.color
+        pygame.draw.rect(surface, color, local_rect, border_radius=8)
         
-        pygame.draw.rect(screen, WHITE, self.rect, 2, border_radius=8)
+        pygame.draw.rect(surface, WHITE, local_rect, 2, border_radius=8)
         
-        text_surface = self.font.render(self.text, True, self.text_color)
+        text_surface = render_text(self.font, self.text, self.text_color)
         
         
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        text_rect = text_surface.get_rect(center=local_rect.center)
+        surface.blit(text_surface, text_rect)
+        return surface
+    
+    def draw(self, screen):
+        """Draw button"""
+        face = self.faces.get(self.hovered)
+        if face is None:
+            face = self.faces[self.hovered] = self.render_face(self.hovered)
+        
+        screen.blit(face, self.rect)
+    
+    def dirty_key(self):
+        """Everything the button shows - it needs redrawing when this changes"""
+        return (self.text, self.color, self.hovered)
     
     def check_hover(self, mouse_pos):
         """Check mouse hovering"""
@@ -112,6 +500,46 @@ class Button:
         return self.rect.collidepoint(mouse_pos)
 
 
+class Scene:
+    """A screen's buttons and actions, built once and reused on every visit
+    
+    Entries can have a condition (shown only while it returns true), a label
+    callable (re-evaluated on show) and a flow flag (visible flowed entries
+    are stacked from flow_y in steps of flow_step).
+    """
+    
+    def __init__(self, flow_y=0, flow_step=0):
+        self.entries = []
+        
+        self.flow_y = flow_y
+        self.flow_step = flow_step
+    
+    def add(self, button, action, condition=None, label=None, flow=False):
+        """Add a button to the scene"""
+        self.entries.append((button, action, condition, label, flow))
+        return self
+    
+    def layout(self):
+        """Visible (buttons, actions), re-evaluating only the conditional entries"""
+        buttons = []
+        actions = []
+        y = self.flow_y
+        
+        for button, action, condition, label, flow in self.entries:
+            if condition and not condition():
+                continue
+            
+            if label:
+                button.set_text(label())
+            if flow:
+                button.rect.y = y
+                y += self.flow_step
+            
+            buttons.append(button)
+            actions.append(action)
+        return buttons, actions
+
+
 class Panel:
     """Display panel container"""
     
@@ -121,18 +549,150 @@ class Panel:
         
         
         self.title = title
+        
+        # Background, border and title never change, so they are drawn once per font
+        self.surface = None
+        self.surface_font = None
+    
+    def render(self, font):
+        """Pre-render the static panel background"""
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        local_rect = surface.get_rect()
+        
+        pygame.draw.rect(surface, self.bg_color, local_rect, border_radius=10)
+        pygame.draw.rect(surface, LIGHT_GRAY, local_rect, 2, border_radius=10)
+        
+        if self.title and font:
+            title_surface = render_text(font, self.title, YELLOW)
+            
+            surface.blit(title_surface, (10, 10))
+        return surface
     
     def draw(self, screen, font=None):
         """Draw the panel"""
-        pygame.draw.rect(screen, self.bg_color, self.rect, border_radius=10)
+        if self.surface is None or self.surface_font is not font:
+            self.surface = self.render(font)
+            self.surface_font = font
+        
+        screen.blit(self.surface, self.rect)
+
+
+class CombatLog:
+    """Scrolling combat log drawn from a persistent surface
+    
+    Lines go into a fixed-capacity ring buffer (the scroll-back history).
+    The visible rows live on one surface: a new line scrolls it up by a row
+    and rasterizes only that row, so adding a line or drawing the log costs
+    the same however long the history is. Scrolling back re-renders just
+    the rows in view.
+    """
+    
+    def __init__(self, width, font_size=SMALL_FONT_SIZE, rows=8, row_height=25, capacity=2000, color=WHITE):
+        self.font_size = font_size
+        self.rows = rows
+        self.row_height = row_height
+        self.color = color
         
+        self.capacity = capacity
+        self.history = [None] * capacity
+        self.start = 0
+        self.count = 0
         
-        pygame.draw.rect(screen, LIGHT_GRAY, self.rect, 2, border_radius=10)
+        # Rows filled since the last clear() and how far back the view is scrolled
+        self.shown = 0
+        self.offset = 0
         
-        if self.title and font:
-            title_surface = font.render(self.title, True, YELLOW)
-            
-            screen.blit(title_surface, (self.rect.x + 10, self.rect.y + 10))
+        self.surface = pygame.Surface((width, rows * row_height), pygame.SRCALPHA)
+        self.version = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def line(self, index):
+        """History line by index, 0 being the oldest kept"""
+        return self.history[(self.start + index) % self.capacity]
+    
+    def add(self, text):
+        """Append a line, drawing only its row if the view is at the bottom"""
+        if self.count < self.capacity:
+            self.history[(self.start + self.count) % self.capacity] = text
+            self.count += 1
+        else:
+            self.history[self.start] = text
+            self.start = (self.start + 1) % self.capacity
+        
+        if self.offset:
+            # Keep a scrolled-back view on the same lines; the row still counts
+            # once the view returns to the bottom
+            self.shown = min(self.shown + 1, self.rows)
+            self.offset = min(self.offset + 1, self.max_offset())
+            return
+        
+        if self.shown < self.rows:
+            row = self.shown
+            self.shown += 1
+        else:
+            row = self.rows - 1
+            self.surface.scroll(0, -self.row_height)
+        
+        self.draw_row(row, text)
+        self.version += 1
+    
+    def draw_row(self, row, text):
+        """Clear one row of the surface and rasterize a line into it"""
+        y = row * self.row_height
+        self.surface.fill((0, 0, 0, 0), (0, y, self.surface.get_width(), self.row_height))
+        
+        if text is not None:
+            self.surface.blit(render_text(get_font(self.font_size), text, self.color), (0, y))
+    
+    def max_offset(self):
+        """Furthest the view can scroll back"""
+        # Far enough that the oldest line reaches the top row, and at least one
+        # line back if clear() hid lines that would otherwise fit
+        return max(self.count - self.rows, 1 if self.count > self.shown else 0)
+    
+    def scroll(self, lines):
+        """Scroll the view back (positive) or forward (negative) through the history"""
+        offset = max(0, min(self.offset + lines, self.max_offset()))
+        if offset == self.offset:
+            return
+        
+        self.offset = offset
+        self.rebuild()
+    
+    def rebuild(self):
+        """Re-render every visible row from the history"""
+        if self.offset:
+            visible = self.rows
+        else:
+            visible = self.shown
+        last = self.count - self.offset
+        first = max(0, last - visible)
+        
+        for row in range(self.rows):
+            index = first + row
+            self.draw_row(row, self.line(index) if index < last else None)
+        self.version += 1
+    
+    def clear(self):
+        """Empty the view; earlier lines stay reachable by scrolling back"""
+        self.shown = 0
+        self.offset = 0
+        
+        self.surface.fill((0, 0, 0, 0))
+        self.version += 1
+    
+    def reset(self):
+        """Empty the view and drop the history"""
+        self.history = [None] * self.capacity
+        self.start = 0
+        self.count = 0
+        self.clear()
+    
+    def draw(self, screen, pos):
+        """Blit the visible rows"""
+        screen.blit(self.surface, pos)
 
 
 # ========== MAIN GAME CLASS ==========
@@ -140,29 +700,42 @@ class Panel:
 class RPGGame:
     """Main game display and controller"""
     
-    def __init__(self):
-        self.screen = pygame.display.set_mode((1100, 750))
+    def __init__(self, headless=False, save_path=AUTOSAVE_PATH, telemetry_dir=TELEMETRY_DIR):
+        self.headless = headless
+        
+        # Headless games draw into an offscreen surface; events still need the
+        # video subsystem, so it falls back to SDL's dummy driver there
+        init_pygame(headless)
         
-        pygame.display.set_caption("Fantasy RPG Adventure")
+        if headless:
+            self.screen = pygame.Surface(SCREEN_SIZE)
+        else:
+            self.screen = pygame.display.set_mode(SCREEN_SIZE)
+            
+            pygame.display.set_caption("Fantasy RPG Adventure")
         self.clock = pygame.time.Clock()
         
         
         self.running = True
         
-        # Fonts
-        self.title_font = pygame.font.Font(None, 56)
-        self.header_font = pygame.font.Font(None, 32)
-        self.normal_font = pygame.font.Font(None, 24)
-        
-        self.small_font = pygame.font.Font(None, 20)
-        
         # Game engine
         self.engine = GameEngine()
         
+        # Gameplay events are buffered and written in batches on a background thread
+        self.telemetry = None
+        if telemetry_dir:
+            path = os.path.join(telemetry_dir, time.strftime("session-%Y%m%d-%H%M%S.tel"))
+            self.telemetry = TelemetrySink(path)
+            self.telemetry.attach(self.engine)
+        
+        # Saves are written off the main thread; only the slot header is read up front
+        self.save_path = save_path
+        self.autosaver = AutoSaver()
+        self.save_header = self.read_save_header()
+        
         # Game state
         self.state = "start"  # start, exploration, combat, shop, gameover, victory
         self.message = ""
-        self.combat_log = []
         
         self.buttons = []
         
@@ -170,8 +743,52 @@ class RPGGame:
         self.button_actions = []
         self.on_victory_callback = None
         
+        # (inventory, version, surface) of the last rendered inventory line
+        self.inventory_cache = None
+        
+        # Dirty-rectangle rendering: region name -> (rect, key) as of the last drawn frame
+        self.region_keys = {}
+        
+        # Delayed transitions; clicks made while one is pending are either
+        # held until it fires (defer_clicks) or dropped
+        self.timeline = Timeline()
+        self.transition_pending = False
+        self.defer_clicks = False
+        self.deferred_clicks = []
+        
+        # Adaptive frame rate
+        self.pacer = FramePacer()
+        self.last_activity = pygame.time.get_ticks()
+        
+        # Per-phase frame profiler, only created (and hooked in) while in use
+        self.profiler = None
+        
         # UI Components
         self.setup_ui()
+        self.setup_scenes()
+        self.show_start()
+    
+    # ========== FONTS ==========
+    
+    @property
+    def title_font(self):
+        """Title font (loaded on first use)"""
+        return get_font(TITLE_FONT_SIZE)
+    
+    @property
+    def header_font(self):
+        """Header and panel title font (loaded on first use)"""
+        return get_font(HEADER_FONT_SIZE)
+    
+    @property
+    def normal_font(self):
+        """Body text font (loaded on first use)"""
+        return get_font(NORMAL_FONT_SIZE)
+    
+    @property
+    def small_font(self):
+        """Small label font (loaded on first use)"""
+        return get_font(SMALL_FONT_SIZE)
     
     def setup_ui(self):
         """Setup UI components"""
@@ -193,38 +810,154 @@ class RPGGame:
         
         # Combat log panel
         self.combat_panel = Panel(700, 220, 380, 240, title="Combat Log")
+        self.combat_log = CombatLog(340)
+        
+        # Equipment and inventory panels
+        self.equip_panel = Panel(20, 470, 380, 120, title="Equipment")
+        self.inv_panel = Panel(20, 600, 660, 130, title="Inventory")
+    
+    def setup_scenes(self):
+        """Build every screen's button layout once"""
+        # Sizes rather than fonts, so a font is only loaded once a screen using it is drawn
+        normal = NORMAL_FONT_SIZE
+        small = SMALL_FONT_SIZE
+        
+        def player():
+            return self.engine.player
+        
+        def fight(enemy_type, on_victory):
+            return lambda: self.start_combat(self.engine.create_enemy(enemy_type), on_victory)
+        
+        def return_to_village():
+            return Scene().add(Button(420, 520, 280, 50, "Return to village", GREEN, font_size=normal), self.reach_village)
+        
+        end_scene = (Scene()
+            .add(Button(350, 520, 200, 50, "Play Again", GREEN, font_size=normal), self.start_game)
+            .add(Button(560, 520, 200, 50, "Quit", RED, font_size=normal), lambda: setattr(self, 'running', False)))
+        
+        shop = (Scene(flow_y=530, flow_step=50)
+            .add(Button(330, 480, 220, 40, "Health Potion (50g)", BLUE, font_size=small), lambda: self.buy_item("Health Potion", 50))
+            .add(Button(560, 480, 220, 40, "Strength Elixir (80g)", BLUE, font_size=small), lambda: self.buy_item("Strength Elixir", 80))
+            .add(Button(560, 530, 220, 40, "← Leave shop", GREEN, font_size=normal), self.reach_village))
+        
+        # One button per piece of equipment, which buys it, equips it from the inventory or takes it off
+        for label, item in (("Steel Sword", "Steel Sword"), ("Iron Helmet", "Iron Helmet"),
+                            ("Chainmail", "Chainmail Armor"), ("Leather Boots", "Leather Boots")):
+            shop.add(Button(330, 530, 220, 40, label, ORANGE, font_size=small),
+                     lambda item=item: self.shop_equipment(item),
+                     label=lambda label=label, item=item: self.equipment_label(label, item), flow=True)
+        
+        self.scenes = {
+            "start": (Scene()
+                .add(Button(400, 400, 300, 60, "Start Adventure", GREEN, font_size=HEADER_FONT_SIZE), self.start_game)
+                .add(Button(400, 480, 300, 60, "Continue", BLUE, font_size=HEADER_FONT_SIZE), self.continue_game,
+                     condition=lambda: self.save_header,
+                     label=lambda: f"Continue (Lv {self.save_header['level']}, {self.save_header['gold']}g)")),
+            
+            "intro": (Scene()
+                .add(Button(420, 480, 280, 50, "Explore north", BLUE, font_size=normal), self.explore_north)
+                .add(Button(420, 540, 280, 50, "Search the area", BLUE, font_size=normal), self.search_area)
+                .add(Button(420, 600, 280, 50, "Head to sounds", BLUE, font_size=normal), fight("dire_wolf", self.reach_village))),
+            
+            "search_area": (Scene()
+                .add(Button(420, 480, 280, 50, "Go to village", BLUE, font_size=normal), self.reach_village)
+                .add(Button(420, 540, 280, 50, "Explore cave", BLUE, font_size=normal), self.explore_cave)
+                .add(Button(420, 600, 280, 50, "Explore forest", BLUE, font_size=normal), self.explore_north)),
+            
+            "explore_north": (Scene()
+                .add(Button(420, 480, 280, 50, "Investigate mushrooms", BLUE, font_size=normal), self.find_potion)
+                .add(Button(420, 540, 280, 50, "Follow rustling", BLUE, font_size=normal), fight("goblin", self.reach_village))
+                .add(Button(420, 600, 280, 50, "Go to village", BLUE, font_size=normal), self.reach_village)),
+            
+            "find_potion": (Scene()
+                .add(Button(420, 480, 280, 50, "Go to village", BLUE, font_size=normal), self.reach_village)
+                .add(Button(420, 540, 280, 50, "Explore cave", BLUE, font_size=normal), self.explore_cave)),
+            
+            "explore_cave": (Scene()
+                .add(Button(420, 480, 280, 50, "Marked tunnel", BLUE, font_size=normal), fight("cave_troll", self.find_treasure))
+                .add(Button(420, 540, 280, 50, "Follow light", BLUE, font_size=normal), self.find_treasure)
+                .add(Button(420, 600, 280, 50, "Go to village", BLUE, font_size=normal), self.reach_village)),
+            
+            "find_treasure": return_to_village(),
+            "complete_boss": return_to_village(),
+            
+            "village": (Scene()
+                .add(Button(350, 480, 200, 45, "🏪 Shop", BLUE, font_size=normal), self.visit_shop)
+                .add(Button(560, 480, 200, 45, "🛏️ Inn (20g)", GREEN, font_size=normal), self.rest_inn)
+                .add(Button(350, 535, 200, 45, "📜 Threats", ORANGE, font_size=normal), self.learn_threats)
+                .add(Button(560, 535, 200, 45, "🗺️ Outskirts", PURPLE, font_size=normal), self.explore_outskirts)),
+            
+            "threats": (Scene()
+                .add(Button(350, 480, 200, 45, "Bandit Ruins", RED, font_size=small), self.bandit_quest,
+                     condition=lambda: not player().has_defeated_boss("Bandit Leader"))
+                .add(Button(560, 480, 200, 45, "Troll Mountain", RED, font_size=small), self.troll_quest,
+                     condition=lambda: not player().has_defeated_boss("Troll King"))
+                .add(Button(350, 535, 200, 45, "Haunted Castle", RED, font_size=small), self.castle_quest,
+                     condition=lambda: not player().has_defeated_boss("Shadow Wraith"))
+                .add(Button(560, 535, 200, 45, "🐉 Dragon", DARK_RED, font_size=small), self.dragon_quest)
+                .add(Button(420, 590, 280, 45, "← Back to village", BLUE, font_size=normal), self.reach_village)),
+            
+            "shop": shop,
+            
+            "inn": Scene().add(Button(420, 520, 280, 50, "Continue", GREEN, font_size=normal), self.reach_village),
+            
+            "combat": (Scene()
+                .add(Button(420, 480, 130, 45, "⚔️ Attack", RED, font_size=normal), self.player_attack)
+                .add(Button(560, 480, 130, 45, "🛡️ Defend", BLUE, font_size=normal), self.player_defend)
+                .add(Button(420, 535, 130, 45, "🧪 Potion", GREEN, font_size=normal), self.use_health_potion)
+                .add(Button(560, 535, 130, 45, "⚡ Elixir", ORANGE, font_size=normal), self.use_strength_elixir)),
+            
+            "gameover": end_scene,
+            "victory": end_scene
+        }
+    
+    def show_scene(self, name):
+        """Switch the active buttons to a cached scene"""
+        self.buttons, self.button_actions = self.scenes[name].layout()
     
     def wrap_text(self, text, font, max_width):
         """Wrap text to fit width"""
-        words = text.split(' ')
-        lines = []
-        
-        
-        current_line = []
-        
-        for word in words:
+        return TEXT_LAYOUT.wrap(text, font, max_width)
+    
+    def read_save_header(self):
+        """Header of the autosave slot, or None if there isn't a usable one"""
+        try:
+            return read_header(self.save_path)
+        except (OSError, SaveError):
+            return None
+    
+    def autosave(self):
+        """Queue an autosave of the current game"""
+        self.autosaver.save(self.engine, self.save_path, "Autosave")
+    
+    def schedule_transition(self, delay_ms, callback, defer_clicks=False):
+        """Run a screen transition after a pause without blocking the loop
+        
+        With defer_clicks, clicks made during the pause are handled once the
+        new screen is up (as the old blocking wait did); otherwise they are
+        dropped, so nothing fires late on a finished fight.
+        """
+        self.transition_pending = True
+        self.defer_clicks = defer_clicks
+        
+        def run_transition():
+            self.transition_pending = False
+            callback()
             
-            test_line = ' '.join(current_line + [word])
-            if font.size(test_line)[0] <= max_width:
-                
-                current_line.append(word)
-            else:
-                if current_line:
-                    
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-        
-        if current_line:
-            lines.append(' '.join(current_line))
+            # Back on the event queue, so a click that starts another transition defers the rest
+            for event in self.deferred_clicks:
+                pygame.event.post(event)
+            self.deferred_clicks = []
         
-        return lines
+        self.timeline.schedule(delay_ms, run_transition)
+    
+    def clear_combat_log(self):
+        """Empty the combat log"""
+        self.combat_log.clear()
     
     def add_combat_log(self, msg):
-        """Add message to combat log"""
-        self.combat_log.append(msg)
-        
-        if len(self.combat_log) > 8:
-            self.combat_log.pop(0)
+        """Add message (text or a CombatEvent) to combat log"""
+        self.combat_log.add(str(msg))
     
     def draw_player_stats(self):
         """Draw player stats panel"""
@@ -236,18 +969,18 @@ class RPGGame:
         level_text = f"Level {player.level}"
         
         
-        level_surf = self.normal_font.render(level_text, True, YELLOW)
+        level_surf = render_text(self.normal_font, level_text, YELLOW)
         self.screen.blit(level_surf, (320, 30))
         
         # HP Bar
-        hp_label = self.normal_font.render("HP:", True, WHITE)
+        hp_label = render_text(self.normal_font, "HP:", WHITE)
         self.screen.blit(hp_label, (50, 55))
         self.hp_bar.update(player.hp, player.max_hp)
         
         self.hp_bar.draw(self.screen, self.small_font)
         
         # EXP Bar
-        exp_label = self.normal_font.render("EXP:", True, WHITE)
+        exp_label = render_text(self.normal_font, "EXP:", WHITE)
         self.screen.blit(exp_label, (50, 105))
         
         
@@ -262,11 +995,11 @@ class RPGGame:
         gold_text = f"💰 Gold: {player.gold}"
         
         
-        atk_surf = self.normal_font.render(atk_text, True, RED)
-        def_surf = self.normal_font.render(def_text, True, BLUE)
+        atk_surf = render_text(self.normal_font, atk_text, RED)
+        def_surf = render_text(self.normal_font, def_text, BLUE)
         
         
-        gold_surf = self.normal_font.render(gold_text, True, YELLOW)
+        gold_surf = render_text(self.normal_font, gold_text, YELLOW)
         
         self.screen.blit(atk_surf, (50, stats_y))
         self.screen.blit(def_surf, (180, stats_y))
@@ -276,35 +1009,39 @@ class RPGGame:
         # Equipment
         equip_y = 470
         
-        equip_panel = Panel(20, equip_y, 380, 120, title="Equipment")
-        equip_panel.draw(self.screen, self.header_font)
+        self.equip_panel.draw(self.screen, self.header_font)
         
         y_off = equip_y + 40
         for slot, item in player.armor.items():
             text = f"{slot.capitalize()}: {item or 'None'}"
             
-            surf = self.small_font.render(text, True, WHITE)
+            surf = render_text(self.small_font, text, WHITE)
             self.screen.blit(surf, (40, y_off))
             y_off += 22
         
         # Inventory
         inv_y = 600
-        inv_panel = Panel(20, inv_y, 660, 130, title="Inventory")
         
-        inv_panel.draw(self.screen, self.header_font)
+        self.inv_panel.draw(self.screen, self.header_font)
         
-        if player.inventory:
-            inv_count = player.get_inventory_count()
-            
-            inv_text = ", ".join([f"{item} x{count}" if count > 1 else item 
-                                 for item, count in inv_count.items()])
-            
-            inv_surf = self.small_font.render(inv_text, True, WHITE)
-            self.screen.blit(inv_surf, (40, inv_y + 40))
-        else:
-            inv_surf = self.small_font.render("Empty", True, LIGHT_GRAY)
+        # Only re-render the inventory line when the inventory actually changed
+        inventory = player.inventory
+        cached = self.inventory_cache
+        
+        if not cached or cached[0] is not inventory or cached[1] != inventory.version:
+            if inventory:
+                inv_count = player.get_inventory_count()
+                
+                inv_text = ", ".join([f"{item} x{count}" if count > 1 else item 
+                                     for item, count in inv_count.items()])
+                
+                inv_surf = render_text(self.small_font, inv_text, WHITE)
+            else:
+                inv_surf = render_text(self.small_font, "Empty", LIGHT_GRAY)
             
-            self.screen.blit(inv_surf, (40, inv_y + 40))
+            self.inventory_cache = (inventory, inventory.version, inv_surf)
+        
+        self.screen.blit(self.inventory_cache[2], (40, inv_y + 40))
     
     def draw_enemy_stats(self):
         """Draw enemy stats panel"""
@@ -323,12 +1060,12 @@ class RPGGame:
             name = f"💀 {name} 💀"
             
             
-        name_surf = self.normal_font.render(name, True, WHITE)
+        name_surf = render_text(self.normal_font, name, WHITE)
         self.screen.blit(name_surf, (730, 30))
         
         
         # HP Bar
-        hp_label = self.normal_font.render("HP:", True, WHITE)
+        hp_label = render_text(self.normal_font, "HP:", WHITE)
         self.screen.blit(hp_label, (730, 55))
         
         self.enemy_hp_bar.update(enemy.hp, enemy.max_hp)
@@ -342,18 +1079,18 @@ class RPGGame:
         
         def_text = f"DEF: {enemy.defense}"
         
-        atk_surf = self.normal_font.render(atk_text, True, RED)
+        atk_surf = render_text(self.normal_font, atk_text, RED)
         
-        def_surf = self.normal_font.render(def_text, True, BLUE)
+        def_surf = render_text(self.normal_font, def_text, BLUE)
         
         self.screen.blit(atk_surf, (730, stats_y))
         
         self.screen.blit(def_surf, (900, stats_y))
         
-        # Strength boost indicator
+        # Strength boost indicator (the boost is already counted in the player's ATK)
         if self.engine.strength_turns > 0:
-            boost_text = f"💪 +{self.engine.strength_boost} ATK ({self.engine.strength_turns} turns)"
-            boost_surf = self.normal_font.render(boost_text, True, YELLOW)
+            boost_text = f"💪 ATK incl. +{self.engine.strength_boost} ({self.engine.strength_turns} turns)"
+            boost_surf = render_text(self.normal_font, boost_text, YELLOW)
             
             self.screen.blit(boost_surf, (730, stats_y + 30))
     
@@ -364,23 +1101,19 @@ class RPGGame:
         lines = self.wrap_text(self.message, self.normal_font, 1020)
         y_offset = 300
         
-        for line in lines[:5]:
-            line_surf = self.normal_font.render(line, True, WHITE)
+        # Tighten the spacing for longer messages (like the threats list) so they still fit
+        line_height = max(20, min(30, 150 // max(1, len(lines))))
+        
+        for line in lines[:150 // line_height]:
+            line_surf = render_text(self.normal_font, line, WHITE)
             self.screen.blit(line_surf, (40, y_offset))
             
-            y_offset += 30
+            y_offset += line_height
     
     def draw_combat_log(self):
         """Draw combat log"""
         self.combat_panel.draw(self.screen, self.header_font)
-        
-        y_offset = 260
-        for log in self.combat_log[-8:]:
-            
-            log_surf = self.small_font.render(log, True, WHITE)
-            self.screen.blit(log_surf, (720, y_offset))
-            
-            y_offset += 25
+        self.combat_log.draw(self.screen, (720, 260))
     
     def draw_buttons(self):
         """Draw all buttons"""
@@ -388,8 +1121,8 @@ class RPGGame:
             
             button.draw(self.screen)
     
-    def handle_events(self):
-        """Handle pygame events"""
+    def handle_events(self, waited_event=None):
+        """Handle pygame events (plus one already taken by event.wait)"""
         
         mouse_pos = pygame.mouse.get_pos()
         
@@ -397,18 +1130,44 @@ class RPGGame:
             
             button.check_hover(mouse_pos)
         
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if waited_event is not None and waited_event.type != pygame.NOEVENT:
+            events.insert(0, waited_event)
+        
+        for event in events:
             if event.type == pygame.QUIT:
                 
                 self.running = False
             
+            # The window contents were lost (uncovered, restored, resized) - repaint everything
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                self.force_redraw()
+            
+            if event.type == pygame.KEYDOWN and event.key == PROFILER_KEY:
+                self.toggle_profiler()
+            
+            if event.type == pygame.KEYDOWN and event.key == CAPTURE_KEY:
+                self.enable_profiler().capture()
+            
+            # Mouse wheel over the combat log scrolls back through earlier lines
+            if event.type == pygame.MOUSEWHEEL and self.state == "combat":
+                if self.combat_panel.rect.collidepoint(mouse_pos):
+                    self.combat_log.scroll(event.y)
+            
             if event.type == pygame.MOUSEBUTTONDOWN:
-                for i, button in enumerate(self.buttons):
+                if not self.transition_pending:
+                    self.click(event.pos)
+                elif self.defer_clicks:
+                    self.deferred_clicks.append(event)
+    
+    def click(self, pos):
+        """Run the action of the button at a position"""
+        for i, button in enumerate(self.buttons):
+            
+            if button.is_clicked(pos):
+                if i < len(self.button_actions):
                     
-                    if button.is_clicked(mouse_pos):
-                        if i < len(self.button_actions):
-                            
-                            self.button_actions[i]()
+                    self.button_actions[i]()
     
     # ========== GAME STATES ==========
     
@@ -416,43 +1175,50 @@ class RPGGame:
         """Start screen"""
         self.screen.fill(BLACK)
         
-        title = self.title_font.render("⚔️ Fantasy RPG Adventure ⚔️", True, YELLOW)
+        title = render_text(self.title_font, "⚔️ Fantasy RPG Adventure ⚔️", YELLOW)
         
         
         title_rect = title.get_rect(center=(550, 200))
         self.screen.blit(title, title_rect)
         
-        subtitle = self.header_font.render("Embark on an epic quest!", True, WHITE)
+        subtitle = render_text(self.header_font, "Embark on an epic quest!", WHITE)
         
         subtitle_rect = subtitle.get_rect(center=(550, 300))
         self.screen.blit(subtitle, subtitle_rect)
         
-        self.buttons = [Button(400, 400, 300, 60, "Start Adventure", GREEN, font=self.header_font)]
-        self.button_actions = [self.start_game]
-        
         self.draw_buttons()
     
+    def show_start(self):
+        """Set up the start screen buttons"""
+        self.state = "start"
+        
+        self.show_scene("start")
+    
     def start_game(self):
         """Initialize new game"""
         self.engine.reset_game()
         
+        self.timeline.clear()
+        self.transition_pending = False
+        self.deferred_clicks = []
+        
         self.state = "exploration"
         self.message = "You wake up in a mysterious forest with no memory of how you got here. The air is thick with magic, and you can hear strange sounds in the distance."
-        self.combat_log = []
+        self.combat_log.reset()
         
         
-        self.buttons = [
-            Button(420, 480, 280, 50, "Explore north", BLUE, font=self.normal_font),
-            Button(420, 540, 280, 50, "Search the area", BLUE, font=self.normal_font),
-            
-            Button(420, 600, 280, 50, "Head to sounds", BLUE, font=self.normal_font)
-        ]
-        self.button_actions = [
-            self.explore_north,
-            self.search_area,
-            
-            lambda: self.start_combat(self.engine.create_enemy("dire_wolf"), self.reach_village)
-        ]
+        self.show_scene("intro")
+    
+    def continue_game(self):
+        """Load the autosave and return to the village"""
+        try:
+            load_game(self.save_path, self.engine)
+        except (OSError, SaveError):
+            self.save_header = None
+            return
+        
+        self.combat_log.reset()
+        self.reach_village()
     
     def exploration_screen(self):
         """Exploration state screen"""
@@ -469,69 +1235,31 @@ class RPGGame:
         """Search area"""
         self.message = self.engine.event_search_area()
         
-        self.buttons = [
-            Button(420, 480, 280, 50, "Go to village", BLUE, font=self.normal_font),
-            Button(420, 540, 280, 50, "Explore cave", BLUE, font=self.normal_font),
-            
-            Button(420, 600, 280, 50, "Explore forest", BLUE, font=self.normal_font)
-        ]
-        self.button_actions = [self.reach_village, self.explore_cave, self.explore_north]
+        self.show_scene("search_area")
     
     def explore_north(self):
         """Explore north"""
         self.message = "You venture deeper into the forest. The trees grow thicker. You spot a glowing mushroom circle and hear rustling nearby."
         
-        self.buttons = [
-            Button(420, 480, 280, 50, "Investigate mushrooms", BLUE, font=self.normal_font),
-            
-            Button(420, 540, 280, 50, "Follow rustling", BLUE, font=self.normal_font),
-            
-            Button(420, 600, 280, 50, "Go to village", BLUE, font=self.normal_font)
-        ]
-        self.button_actions = [
-            self.find_potion,
-            lambda: self.start_combat(self.engine.create_enemy("goblin"), self.reach_village),
-            
-            self.reach_village
-        ]
+        self.show_scene("explore_north")
     
     def find_potion(self):
         """Find potion"""
         self.message = self.engine.event_find_potion()
         
-        self.buttons = [
-            Button(420, 480, 280, 50, "Go to village", BLUE, font=self.normal_font),
-            
-            Button(420, 540, 280, 50, "Explore cave", BLUE, font=self.normal_font)
-        ]
-        self.button_actions = [self.reach_village, self.explore_cave]
+        self.show_scene("find_potion")
     
     def explore_cave(self):
         """Cave exploration"""
         self.message = "You enter a dark, damp cave. The sound of dripping water echoes. You see two tunnels - one with markings, one with light."
         
-        self.buttons = [
-            Button(420, 480, 280, 50, "Marked tunnel", BLUE, font=self.normal_font),
-            
-            
-            Button(420, 540, 280, 50, "Follow light", BLUE, font=self.normal_font),
-            
-            Button(420, 600, 280, 50, "Go to village", BLUE, font=self.normal_font)
-        ]
-        self.button_actions = [
-            lambda: self.start_combat(self.engine.create_enemy("cave_troll"), self.find_treasure),
-            
-            self.find_treasure,
-            self.reach_village
-        ]
+        self.show_scene("explore_cave")
     
     def find_treasure(self):
         """Find treasure"""
         self.message = self.engine.event_find_treasure()
         
-        self.buttons = [Button(420, 520, 280, 50, "Return to village", GREEN, font=self.normal_font)]
-        
-        self.button_actions = [self.reach_village]
+        self.show_scene("find_treasure")
     
     def reach_village(self):
         """Reach village"""
@@ -539,15 +1267,7 @@ class RPGGame:
         
         self.message = "You arrive at a bustling village. The villagers look worried. An elder approaches: 'We need a hero. Many threats plague our land. Will you help us?'"
         
-        self.buttons = [
-            Button(350, 480, 200, 45, "🏪 Shop", BLUE, font=self.normal_font),
-            
-            Button(560, 480, 200, 45, "🛏️ Inn (20g)", GREEN, font=self.normal_font),
-            Button(350, 535, 200, 45, "📜 Threats", ORANGE, font=self.normal_font),
-            
-            Button(560, 535, 200, 45, "🗺️ Outskirts", PURPLE, font=self.normal_font)
-        ]
-        self.button_actions = [self.visit_shop, self.rest_inn, self.learn_threats, self.explore_outskirts]
+        self.show_scene("village")
     
     def learn_threats(self):
         """Learn about threats"""
@@ -556,33 +1276,7 @@ class RPGGame:
         
         self.message = f"The elder explains:\n• Bandits in western ruins\n• Troll King in mountains\n• Shadows in castle\n• Ancient Dragon in volcano\n\nDefeated: {defeated}"
         
-        self.buttons = []
-        
-        self.button_actions = []
-        
-        if not self.engine.player.has_defeated_boss("Bandit Leader"):
-            self.buttons.append(Button(350, 480, 200, 45, "Bandit Ruins", RED, font=self.small_font))
-            
-            self.button_actions.append(self.bandit_quest)
-        
-        if not self.engine.player.has_defeated_boss("Troll King"):
-            
-            self.buttons.append(Button(560, 480, 200, 45, "Troll Mountain", RED, font=self.small_font))
-            self.button_actions.append(self.troll_quest)
-        
-        if not self.engine.player.has_defeated_boss("Shadow Wraith"):
-            
-            
-            self.buttons.append(Button(350, 535, 200, 45, "Haunted Castle", RED, font=self.small_font))
-            self.button_actions.append(self.castle_quest)
-        
-        self.buttons.append(Button(560, 535, 200, 45, "🐉 Dragon", DARK_RED, font=self.small_font))
-        self.button_actions.append(self.dragon_quest)
-        
-        self.buttons.append(Button(420, 590, 280, 45, "← Back to village", BLUE, font=self.normal_font))
-        
-        
-        self.button_actions.append(self.reach_village)
+        self.show_scene("threats")
     
     def explore_outskirts(self):
         """Random encounter"""
@@ -640,9 +1334,7 @@ class RPGGame:
         msg = self.engine.complete_boss(boss_name, loot)
         self.message = msg
         
-        self.buttons = [Button(420, 520, 280, 50, "Return to village", GREEN, font=self.normal_font)]
-        
-        self.button_actions = [self.reach_village]
+        self.show_scene("complete_boss")
     
     # ========== SHOP & INN ==========
     
@@ -653,69 +1345,44 @@ class RPGGame:
         
         self.message = "Welcome to the Village Shop! Buy items and equipment."
         
-        self.buttons = [
-            Button(330, 480, 220, 40, "Health Potion (50g)", BLUE, font=self.small_font),
-            
-            Button(560, 480, 220, 40, "Strength Elixir (80g)", BLUE, font=self.small_font)
-        ]
-        self.button_actions = [
-            lambda: self.buy_item("Health Potion", 50),
-            
-            lambda: self.buy_item("Strength Elixir", 80)
-        ]
-        
-        y = 530
-        player = self.engine.player
-        
-        if not player.armor["weapon"]:
-            self.buttons.append(Button(330, y, 220, 40, "Steel Sword (100g)", ORANGE, font=self.small_font))
-            
-            self.button_actions.append(lambda: self.buy_armor("Steel Sword", "weapon", "attack", 10, 100))
-            y += 50
-        
-        if not player.armor["helmet"]:
-            self.buttons.append(Button(330, y, 220, 40, "Iron Helmet (120g)", ORANGE, font=self.small_font))
-            self.button_actions.append(lambda: self.buy_armor("Iron Helmet", "helmet", "defense", 5, 120))
-            y += 50
-        
-        if not player.armor["chest"]:
-            self.buttons.append(Button(330, y, 220, 40, "Chainmail (200g)", ORANGE, font=self.small_font))
-            
-            self.button_actions.append(lambda: self.buy_armor("Chainmail Armor", "chest", "defense", 8, 200))
-            y += 50
-        
-        if not player.armor["boots"]:
-            self.buttons.append(Button(330, y, 220, 40, "Leather Boots (80g)", ORANGE, font=self.small_font))
-            self.button_actions.append(lambda: self.buy_armor("Leather Boots", "boots", "defense", 3, 80))
-            
-            
-        
-        self.buttons.append(Button(420, 670, 280, 40, "← Leave shop", GREEN, font=self.normal_font))
-        
-        self.button_actions.append(self.reach_village)
+        self.show_scene("shop")
     
     def buy_item(self, item, cost):
         """Buy item"""
         self.message = self.engine.buy_item(item, cost)
         
-        pygame.time.wait(500)
-        self.visit_shop()
+        self.schedule_transition(500, self.visit_shop, defer_clicks=True)
     
-    def buy_armor(self, item, slot, bonus_type, bonus, cost):
-        """Buy armor"""
-        self.message = self.engine.buy_armor(item, slot, bonus_type, bonus, cost)
+    def equipment_label(self, label, item):
+        """Shop button text for a piece of equipment: its price, or equip / unequip once owned"""
+        player = self.engine.player
+        equipment = EQUIPMENT[item]
         
-        pygame.time.wait(500)
-        self.visit_shop()
+        if player.armor[equipment.slot] == item:
+            return f"Unequip {label}"
+        if player.has_item(item):
+            return f"Equip {label}"
+        return f"{label} ({equipment.cost}g)"
+    
+    def shop_equipment(self, item):
+        """Buy, equip or unequip a piece of equipment"""
+        player = self.engine.player
+        equipment = EQUIPMENT[item]
+        
+        if player.armor[equipment.slot] == item:
+            self.message = self.engine.unequip_armor(equipment.slot)
+        elif player.has_item(item):
+            self.message = self.engine.equip_item(item)
+        else:
+            self.message = self.engine.buy_armor(*equipment)
+        
+        self.schedule_transition(500, self.visit_shop, defer_clicks=True)
     
     def rest_inn(self):
         """Rest at inn"""
         self.message = self.engine.event_rest_inn()
         
-        self.buttons = [Button(420, 520, 280, 50, "Continue", GREEN, font=self.normal_font)]
-        
-        
-        self.button_actions = [self.reach_village]
+        self.show_scene("inn")
     
     # ========== COMBAT ==========
     
@@ -725,26 +1392,16 @@ class RPGGame:
         
         
         self.on_victory_callback = on_victory
-        self.combat_log = []
+        self.clear_combat_log()
         
         self.message = self.engine.start_combat(enemy)
         
+        # A new enemy starts with a full bar rather than draining from the last one
+        self.enemy_hp_bar.update(enemy.hp, enemy.max_hp, animate=False)
+        
         self.add_combat_log(f"Battle vs {enemy.name}!")
         
-        self.buttons = [
-            Button(420, 480, 130, 45, "⚔️ Attack", RED, font=self.normal_font),
-            Button(560, 480, 130, 45, "🛡️ Defend", BLUE, font=self.normal_font),
-            
-            Button(420, 535, 130, 45, "🧪 Potion", GREEN, font=self.normal_font),
-            Button(560, 535, 130, 45, "⚡ Elixir", ORANGE, font=self.normal_font)
-        ]
-        self.button_actions = [
-            self.player_attack,
-            self.player_defend,
-            
-            self.use_health_potion,
-            self.use_strength_elixir
-        ]
+        self.show_scene("combat")
     
     def combat_screen(self):
         """Combat screen"""
@@ -765,13 +1422,16 @@ class RPGGame:
         
         if self.engine.is_combat_over():
             if self.engine.player_is_alive():
-                pygame.time.wait(2000)
-                self.state = "exploration"
-                
-                self.on_victory_callback()
+                self.autosave()
+                self.schedule_transition(2000, self.finish_combat)
             else:
-                pygame.time.wait(1000)
-                self.game_over()
+                self.schedule_transition(1000, self.game_over)
+    
+    def finish_combat(self):
+        """Leave a won fight"""
+        self.state = "exploration"
+        
+        self.on_victory_callback()
     
     def player_defend(self):
         """Player defends"""
@@ -782,8 +1442,7 @@ class RPGGame:
             self.add_combat_log(msg)
         
         if not self.engine.player_is_alive():
-            pygame.time.wait(1000)
-            self.game_over()
+            self.schedule_transition(1000, self.game_over)
     
     def use_health_potion(self):
         """Use health potion"""
@@ -793,8 +1452,7 @@ class RPGGame:
             self.add_combat_log(msg)
         
         if not self.engine.player_is_alive():
-            pygame.time.wait(1000)
-            self.game_over()
+            self.schedule_transition(1000, self.game_over)
     
     def use_strength_elixir(self):
         """Use strength elixir"""
@@ -803,8 +1461,7 @@ class RPGGame:
             self.add_combat_log(msg)
         
         if not self.engine.player_is_alive():
-            pygame.time.wait(1000)
-            self.game_over()
+            self.schedule_transition(1000, self.game_over)
     
     # ========== END SCREENS ==========
     
@@ -814,18 +1471,13 @@ class RPGGame:
         
         self.message = "💀 You have been defeated..."
         
-        self.buttons = [
-            Button(350, 520, 200, 50, "Play Again", GREEN, font=self.normal_font),
-            
-            Button(560, 520, 200, 50, "Quit", RED, font=self.normal_font)
-        ]
-        self.button_actions = [self.start_game, lambda: setattr(self, 'running', False)]
+        self.show_scene("gameover")
     
     def gameover_screen(self):
         """Game over screen"""
         self.screen.fill(BLACK)
         
-        title = self.title_font.render("💀 GAME OVER 💀", True, RED)
+        title = render_text(self.title_font, "💀 GAME OVER 💀", RED)
         
         title_rect = title.get_rect(center=(550, 250))
         
@@ -834,7 +1486,7 @@ class RPGGame:
         lines = self.wrap_text(self.message, self.normal_font, 800)
         y = 350
         for line in lines:
-            surf = self.normal_font.render(line, True, WHITE)
+            surf = render_text(self.normal_font, line, WHITE)
             
             rect = surf.get_rect(center=(550, y))
             self.screen.blit(surf, rect)
@@ -850,18 +1502,13 @@ class RPGGame:
         
         self.message = f"🐉 The dragon falls! You are a legendary hero! Final Level: {player.level} | Gold: {player.gold}"
         
-        self.buttons = [
-            Button(350, 520, 200, 50, "Play Again", GREEN, font=self.normal_font),
-            
-            Button(560, 520, 200, 50, "Quit", RED, font=self.normal_font)
-        ]
-        self.button_actions = [self.start_game, lambda: setattr(self, 'running', False)]
+        self.show_scene("victory")
     
     def victory_screen(self):
         """Victory screen"""
         self.screen.fill(BLACK)
         
-        title = self.title_font.render("🎊 VICTORY! 🎊", True, YELLOW)
+        title = render_text(self.title_font, "🎊 VICTORY! 🎊", YELLOW)
         
         title_rect = title.get_rect(center=(550, 200))
         self.screen.blit(title, title_rect)
@@ -870,7 +1517,7 @@ class RPGGame:
         y = 320
         for line in lines:
             
-            surf = self.normal_font.render(line, True, WHITE)
+            surf = render_text(self.normal_font, line, WHITE)
             rect = surf.get_rect(center=(550, y))
             
             self.screen.blit(surf, rect)
@@ -878,31 +1525,262 @@ class RPGGame:
         
         self.draw_buttons()
     
+    # ========== RENDERING ==========
+    
+    def draw_screen(self):
+        """Draw the current state's screen"""
+        if self.state == "start":
+            self.start_screen()
+            
+        elif self.state == "exploration" or self.state == "shop":
+            self.exploration_screen()
+            
+        elif self.state == "combat":
+            self.combat_screen()
+            
+        elif self.state == "gameover":
+            self.gameover_screen()
+            
+        elif self.state == "victory":
+            self.victory_screen()
+    
+    def frame_regions(self):
+        """Screen regions for the current state as name -> (rect, key)
+        
+        A region is redrawn only when its key differs from the last frame.
+        """
+        screen_rect = self.screen.get_rect()
+        regions = {}
+        
+        if self.state in ("start", "gameover", "victory"):
+            regions["screen"] = (screen_rect, (self.state, self.message))
+        else:
+            # Switching between exploration and combat repaints the whole window once
+            regions["screen"] = (screen_rect, "combat" if self.state == "combat" else "exploration")
+            
+            player = self.engine.player
+            self.hp_bar.update(player.hp, player.max_hp)
+            self.exp_bar.update(player.exp, player.exp_needed)
+            
+            # Bars are their own regions so a tweening fill repaints only the bar
+            for name, bar in (("hp_bar", self.hp_bar), ("exp_bar", self.exp_bar)):
+                bar.advance()
+                regions[name] = (bar.rect, bar.dirty_key())
+            
+            regions["player"] = (self.stats_panel.rect, (
+                player.level, player.attack, player.defense, player.gold
+            ))
+            regions["equipment"] = (self.equip_panel.rect, tuple(player.armor.values()))
+            regions["inventory"] = (self.inv_panel.rect, (id(player.inventory), player.inventory.version))
+            regions["message"] = (self.message_panel.rect, self.message)
+            
+            enemy = self.engine.current_enemy
+            if self.state == "combat" and enemy:
+                self.enemy_hp_bar.update(enemy.hp, enemy.max_hp)
+                self.enemy_hp_bar.advance()
+                
+                regions["enemy_hp_bar"] = (self.enemy_hp_bar.rect, self.enemy_hp_bar.dirty_key())
+                regions["enemy"] = (self.enemy_panel.rect, (
+                    id(enemy), enemy.name, enemy.attack, enemy.defense,
+                    self.engine.strength_boost, self.engine.strength_turns
+                ))
+            
+            if self.state == "combat":
+                regions["combat_log"] = (self.combat_panel.rect, self.combat_log.version)
+        
+        for i, button in enumerate(self.buttons):
+            regions[f"button{i}"] = (button.rect.copy(), (id(button), tuple(button.rect)) + button.dirty_key())
+        
+        # The overlay refreshes four times a second rather than every frame
+        if self.profiler:
+            regions["profiler"] = (PROFILER_RECT, pygame.time.get_ticks() // 250)
+        
+        return regions
+    
+    def collect_dirty_rects(self):
+        """Rects whose contents changed since the last drawn frame"""
+        regions = self.frame_regions()
+        previous = self.region_keys
+        dirty = []
+        
+        for name, (rect, key) in regions.items():
+            old = previous.get(name)
+            
+            if old is None or old[1] != key:
+                dirty.append(rect)
+                if old is not None and old[0] != rect:
+                    dirty.append(old[0])
+        
+        # Regions that went away (old buttons, the enemy panel) must be painted over
+        for name, (rect, key) in previous.items():
+            if name not in regions:
+                dirty.append(rect)
+        
+        self.region_keys = regions
+        return dirty
+    
+    def force_redraw(self):
+        """Repaint the whole window on the next frame"""
+        self.region_keys = {}
+    
+    def render(self):
+        """Redraw only the regions that changed and push just those rects
+        
+        Drawing is clipped to the bounding box of the dirty rects, so the
+        screen functions stay simple while untouched pixels are left alone.
+        Returns the updated rects (empty when the frame was idle).
+        """
+        dirty = self.collect_dirty_rects()
+        if not dirty:
+            return dirty
+        
+        self.screen.set_clip(dirty[0].unionall(dirty[1:]))
+        self.draw_screen()
+        if self.profiler:
+            self.draw_profiler_overlay()
+        self.screen.set_clip(None)
+        
+        self.present(dirty)
+        return dirty
+    
+    def present(self, dirty):
+        """Push the updated rects to the window"""
+        if not self.headless:
+            pygame.display.update(dirty)
+    
+    # ========== PROFILING ==========
+    
+    def profiled_methods(self):
+        """Phases the profiler times: input, every screen function, every draw_* call and present"""
+        names = sorted(name for name in dir(type(self))
+                       if name.endswith("_screen") or name.startswith("draw_") and name != "draw_profiler_overlay")
+        return ["handle_events"] + names + ["present"]
+    
+    def enable_profiler(self):
+        """Start timing every frame phase; returns the FrameProfiler for adding hooks"""
+        if self.profiler is None:
+            self.profiler = FrameProfiler(dump_dir=PROFILE_DIR)
+            self.profiler.instrument(self, self.profiled_methods())
+            self.profiler.instrument(self.timeline, ["update"], "timeline.")
+        return self.profiler
+    
+    def disable_profiler(self):
+        """Unhook the profiler and drop its overlay"""
+        if self.profiler is not None:
+            self.profiler.uninstrument()
+            self.profiler = None
+    
+    def toggle_profiler(self):
+        """F3: show or hide the profiling overlay"""
+        if self.profiler is None:
+            self.enable_profiler()
+        else:
+            self.disable_profiler()
+    
+    def draw_profiler_overlay(self):
+        """Frame-time histogram, slowest phases and allocation counts in the corner"""
+        stats = self.profiler.stats()
+        font = self.small_font
+        
+        overlay = pygame.Surface(PROFILER_RECT.size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 200))
+        
+        lines = [f"Frames: {stats['frames']}   (F3 hide, F4 cProfile)"]
+        
+        frame = stats["frame"]
+        if frame["samples"]:
+            lines.append(f"Frame ms  p50 {frame['p50']:.2f}  p95 {frame['p95']:.2f}  max {frame['max']:.1f}")
+        
+        # Histogram of recent frame times, one bar per bucket
+        counts = stats["histogram"]
+        peak = max(counts) or 1
+        bar_width = (PROFILER_RECT.width - 20) // len(counts)
+        
+        for i, count in enumerate(counts):
+            height = int(30 * count / peak)
+            color = GREEN if i < 4 else YELLOW if i < 6 else RED
+            pygame.draw.rect(overlay, color, (10 + i * bar_width, 78 - height, bar_width - 2, height))
+        
+        # Slowest phases by p95, as (name, p50, p95) columns
+        rows = [("phase", "p50", "p95")]
+        rows += [(name, f"{timing['p50']:.2f}", f"{timing['p95']:.2f}")
+                 for name, timing in list(stats["phases"].items())[:6]]
+        
+        footer = []
+        allocations = stats["allocations"]
+        if allocations:
+            footer.append(f"Allocs/frame {allocations[0]:.0f} blocks, peak {allocations[1] / 1024:.0f} KB")
+        
+        if self.profiler.cprofile is not None:
+            footer.append(f"cProfile: {self.profiler.profile_frames_left} frames left")
+        elif self.profiler.last_dump:
+            footer.append(f"Saved {os.path.basename(self.profiler.last_dump)}")
+        
+        # Rendered directly: these strings change constantly and would only churn TEXT_CACHE
+        y = 4
+        for line in lines:
+            overlay.blit(font.render(line, True, WHITE), (10, y))
+            y += 18
+        
+        y = 84
+        for row in rows:
+            for x, text in zip((10, 190, 245), row):
+                overlay.blit(font.render(text, True, LIGHT_GRAY if y == 84 else WHITE), (x, y))
+            y += 18
+        
+        for line in footer:
+            overlay.blit(font.render(line, True, WHITE), (10, y))
+            y += 18
+        
+        self.screen.blit(overlay, PROFILER_RECT)
+    
     # ========== MAIN LOOP ==========
     
+    def is_animating(self):
+        """Whether something on screen changes without input"""
+        bars = (self.hp_bar, self.exp_bar, self.enemy_hp_bar)
+        return self.timeline.pending() or any(bar.animating() for bar in bars)
+    
+    def can_idle(self):
+        """True once nothing has changed for a while and nothing is animating"""
+        if self.is_animating():
+            return False
+        return pygame.time.get_ticks() - self.last_activity > ACTIVE_LINGER_MS
+    
     def run(self):
-        """Main game loop"""
+        """Main game loop
+        
+        Runs at ACTIVE_FPS while input, hover changes or animations are
+        happening; otherwise blocks in pygame.event.wait until an event
+        arrives (or IDLE_WAIT_MS passes) instead of waking 60 times a second.
+        """
         while self.running:
-            self.handle_events()
+            start = pygame.time.get_ticks()
+            idle = self.can_idle()
+            waited_event = pygame.event.wait(IDLE_WAIT_MS) if idle else None
             
-            if self.state == "start":
-                self.start_screen()
-                
-            elif self.state == "exploration" or self.state == "shop":
-                self.exploration_screen()
-                
-            elif self.state == "combat":
-                self.combat_screen()
-                
-            elif self.state == "gameover":
-                self.gameover_screen()
-                
-            elif self.state == "victory":
-                self.victory_screen()
+            # Read once: F3 can switch the profiler on or off mid-frame
+            profiler = self.profiler
+            if profiler:
+                profiler.begin_frame()
+            
+            self.handle_events(waited_event)
+            self.timeline.update()
+            dirty = self.render()
+            
+            if profiler:
+                profiler.end_frame()
+            
+            if dirty or self.is_animating():
+                self.last_activity = pygame.time.get_ticks()
             
-            pygame.display.flip()
-            self.clock.tick(60)
+            if not idle:
+                self.clock.tick(ACTIVE_FPS)
+            self.pacer.record(pygame.time.get_ticks() - start, idle, bool(dirty))
         
+        self.autosaver.close()
+        if self.telemetry:
+            self.telemetry.close()
         pygame.quit()
         sys.exit()
 
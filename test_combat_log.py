@@ -0,0 +1,37 @@
+"""
+test_combat_log.py
+Combat log tests - Lines added while scrolled back show up again at the bottom
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from Game_display import CombatLog, init_pygame
+
+
+def _visible(log):
+    """Lines the view shows, oldest first"""
+    visible = log.rows if log.offset else log.shown
+    last = log.count - log.offset
+    return [log.line(index) for index in range(max(0, last - visible), last)]
+
+
+def test_lines_added_while_scrolled_back():
+    init_pygame(headless=True)
+    log = CombatLog(400, rows=8)
+
+    # Clearing leaves earlier lines in the history, so the view can scroll back
+    for i in range(2):
+        log.add(f"line {i}")
+    log.clear()
+    log.add("line 2")
+
+    log.scroll(1)
+    for i in range(3, 8):
+        log.add(f"line {i}")
+    log.scroll(-log.offset)
+
+    assert log.offset == 0
+    assert log.shown == 6
+    assert _visible(log) == [f"line {i}" for i in range(2, 8)]
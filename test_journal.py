@@ -0,0 +1,73 @@
+"""
+test_journal.py
+Journal tests - Replay and seek across reseeds and restores
+"""
+
+from Game_Logic import GameEngine
+from Game_Journal import Journal
+
+
+def _fight(engine):
+    engine.start_combat(engine.create_enemy("goblin"))
+    while not engine.is_combat_over():
+        engine.player_attack()
+
+
+def test_replay_across_reseed():
+    engine = GameEngine(1)
+    journal = Journal()
+    journal.attach(engine)
+
+    for n in range(3):
+        engine.reset_game()
+        engine.seed(n)
+        _fight(engine)
+
+    replayed, _ = journal.replay()
+    assert replayed.snapshot()["player"] == engine.snapshot()["player"]
+    assert journal.seek(len(journal)).snapshot()["player"] == engine.snapshot()["player"]
+
+
+def test_replay_across_restore():
+    engine = GameEngine(1)
+    journal = Journal()
+    journal.attach(engine)
+
+    _fight(engine)
+    saved = engine.snapshot()
+    engine.reset_game()
+    engine.restore(saved)
+    _fight(engine)
+
+    replayed, _ = journal.replay()
+    assert replayed.snapshot()["player"] == engine.snapshot()["player"]
+
+
+def test_keyword_arguments_are_recorded():
+    engine = GameEngine(1)
+    engine.player.gold = 500
+    journal = Journal()
+    journal.attach(engine)
+
+    engine.buy_item(item_name="Health Potion", cost=50)
+    engine.buy_armor("Steel Sword", "weapon", bonus_type="attack", bonus_value=10, cost=100)
+
+    replayed, _ = journal.replay()
+    assert replayed.snapshot()["player"] == engine.snapshot()["player"]
+
+
+def test_failed_action_keeps_journal_in_step():
+    engine = GameEngine(1)
+    journal = Journal()
+    journal.attach(engine)
+
+    _fight(engine)
+    try:
+        engine.buy_armor("Cursed Ring", "finger", "attack", 5, 0)
+    except KeyError:
+        pass
+    _fight(engine)
+
+    assert len(journal.codes) == len(journal.checks)
+    replayed, _ = journal.replay()
+    assert replayed.snapshot()["player"] == engine.snapshot()["player"]
@@ -0,0 +1,34 @@
+"""
+test_save.py
+Save tests - Concurrent writers to one slot
+"""
+
+import os
+import threading
+
+from Game_Save import write_atomic
+
+
+def test_concurrent_writes_to_one_slot(tmp_path):
+    path = os.path.join(tmp_path, "slot1.sav")
+    errors = []
+
+    def writer(value):
+        try:
+            for _ in range(50):
+                write_atomic(path, bytes([value]) * 4096)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(value,)) for value in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+
+    with open(path, "rb") as f:
+        data = f.read()
+    assert len(data) == 4096 and len(set(data)) == 1
+    assert os.listdir(tmp_path) == ["slot1.sav"]
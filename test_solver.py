@@ -0,0 +1,35 @@
+"""
+test_solver.py
+Solver tests - Long fights solve without recursion
+"""
+
+import pytest
+
+from Game_Logic import Player, GameEngine
+from Game_Solver import solve_fight
+
+
+def _long_fight(player_hp, enemy_hp):
+    """Fight where each side takes exactly 1 damage a turn"""
+    player = Player()
+    player.hp = player.max_hp = player_hp
+    player.attack = 0
+    player.defense = 50
+
+    enemy = GameEngine.create_enemy("goblin")
+    enemy.hp = enemy_hp
+    enemy.attack = 0
+    enemy.defense = 50
+    return player, enemy
+
+
+def test_long_fight_won():
+    result = solve_fight(*_long_fight(5000, 3000))
+    assert result["win_probability"] == pytest.approx(1.0)
+    assert result["expected_turns"] == pytest.approx(3000)
+
+
+def test_long_fight_lost():
+    result = solve_fight(*_long_fight(3000, 5000), policy="defend_low")
+    assert result["win_probability"] == 0.0
+    assert result["expected_turns"] == pytest.approx(3000)
@@ -0,0 +1,46 @@
+"""
+test_text_layout.py
+Text layout tests - Wrapping agrees with the font's own line measurement
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from Game_display import TextLayout, init_pygame
+
+
+def _greedy(text, font, max_width):
+    """Reference wrap measuring every candidate line"""
+    lines = []
+    for paragraph in text.split("\n"):
+        current_line = []
+        for word in paragraph.split(" "):
+            if current_line and font.size(" ".join(current_line + [word]))[0] > max_width:
+                lines.append(" ".join(current_line))
+                current_line = [word]
+            else:
+                current_line.append(word)
+        lines.append(" ".join(current_line))
+    return lines
+
+
+def test_kerned_line_at_the_edge_is_not_broken():
+    init_pygame(headless=True)
+    font = pygame.font.Font(None, 20)
+    text = "quick WWWWW Bandit-Leader"
+    width = font.size(text)[0]
+
+    assert TextLayout().layout(text, font, width) == [text]
+    assert TextLayout().layout(text, font, width - 1) == _greedy(text, font, width - 1)
+
+
+def test_matches_measured_wrap():
+    init_pygame(headless=True)
+    font = pygame.font.Font(None, 20)
+    text = "The Bandit-Leader swings WWWWW for 12 damage!\nYou gain 35 EXP and 20 gold. AVAVA To-To Wally"
+
+    for max_width in range(60, 400, 7):
+        assert TextLayout().layout(text, font, max_width) == _greedy(text, font, max_width)